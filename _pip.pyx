@@ -0,0 +1,41 @@
+# cython: language_level=3
+"""
+Compiled ray-casting point-in-polygon test for the Hartford boundary
+Build in place with: python setup.py build_ext --inplace
+"""
+
+cimport cython
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef inline bint _contains_ring(const double[::1] bx, const double[::1] by,
+                                double x, double y) noexcept nogil:
+    cdef bint inside = False
+    cdef Py_ssize_t n = bx.shape[0]
+    cdef Py_ssize_t i
+    cdef Py_ssize_t j = n - 1
+    for i in range(n):
+        if ((by[i] > y) != (by[j] > y) and
+                x < (bx[j] - bx[i]) * (y - by[i]) / (by[j] - by[i]) + bx[i]):
+            inside = not inside
+        j = i
+    return inside
+
+
+cpdef bint contains_ring(const double[::1] bx, const double[::1] by, double x, double y):
+    """Test a single point against the ring given by bx/by"""
+    return _contains_ring(bx, by, x, y)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def contains_ring_vec(const double[::1] bx, const double[::1] by,
+                      const double[::1] xs, const double[::1] ys,
+                      unsigned char[::1] out):
+    """Test every (xs[k], ys[k]) against the ring, writing 1/0 into out[k]"""
+    cdef Py_ssize_t k
+    with nogil:
+        for k in range(xs.shape[0]):
+            out[k] = _contains_ring(bx, by, xs[k], ys[k])
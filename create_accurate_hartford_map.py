@@ -4,361 +4,83 @@ Create an accurate Hartford Heat Vulnerability Index map with the correct city s
 Based on research of Hartford's actual boundaries
 """
 
-import pandas as pd
-import geopandas as gpd
-import matplotlib.pyplot as plt
-import numpy as np
-from shapely.geometry import Polygon, Point
-from shapely.ops import unary_union
-import matplotlib.patches as mpatches
-from scipy.spatial import Voronoi
-import warnings
-warnings.filterwarnings('ignore')
+from hartford_map_core import build_hartford_map
 
-def create_accurate_hartford_map():
-    """Create an accurate Hartford map with correct city boundaries"""
-    
-    print("Creating accurate Hartford Heat Vulnerability Index map...")
-    
-    # Load the vulnerability data
-    try:
-        hartford_data = pd.read_csv('hvi_output/hartford_vulnerability_data.csv')
-        print(f"✓ Loaded vulnerability data: {len(hartford_data)} tracts")
-    except FileNotFoundError:
-        print("✗ Vulnerability data not found. Run hartford_hvi_implementation.py first.")
-        return
-    
-    # Create accurate Hartford city boundary and census tracts
-    hartford_gdf = create_accurate_hartford_boundary_with_tracts(hartford_data)
-    
-    # Create the final map
-    create_professional_hartford_map(hartford_gdf)
+# Hartford actual boundary coordinates (more accurate based on research)
+# Hartford is roughly bounded by:
+# - Connecticut River on the east (forming natural boundary with East Hartford)
+# - West Hartford town line on the west
+# - Windsor/Bloomfield on the north
+# - Wethersfield/Newington on the south
 
-def create_accurate_hartford_boundary_with_tracts(hartford_data):
-    """Create accurate Hartford city boundary based on research"""
-    
-    print("Creating accurate Hartford city boundary with census tracts...")
-    
-    # Hartford actual boundary coordinates (more accurate based on research)
-    # Hartford is roughly bounded by:
-    # - Connecticut River on the east (forming natural boundary with East Hartford)
-    # - West Hartford town line on the west
-    # - Windsor/Bloomfield on the north
-    # - Wethersfield/Newington on the south
-    
-    # More accurate Hartford city boundary coordinates
-    hartford_boundary_coords = [
-        # Starting from northwest, going clockwise
-        (-72.7100, 41.7850),  # Northwest corner (near Bloomfield border)
-        (-72.7050, 41.7900),  # North border with Windsor
-        (-72.6850, 41.7950),  # Northeast area
-        (-72.6750, 41.7900),  # East side approaching river
-        (-72.6650, 41.7850),  # Near Connecticut River
-        (-72.6550, 41.7800),  # Connecticut River area (east boundary)
-        (-72.6500, 41.7750),  # Connecticut River continued
-        (-72.6480, 41.7700),  # River bend
-        (-72.6450, 41.7650),  # East Hartford border
-        (-72.6470, 41.7600),  # Southeast area
-        (-72.6500, 41.7550),  # South-central
-        (-72.6550, 41.7500),  # Southeast with Wethersfield
-        (-72.6650, 41.7450),  # South border
-        (-72.6750, 41.7400),  # Southwest area
-        (-72.6900, 41.7350),  # South border with Newington
-        (-72.7050, 41.7380),  # Southwest corner
-        (-72.7150, 41.7420),  # West border with West Hartford
-        (-72.7200, 41.7500),  # West side continued
-        (-72.7180, 41.7600),  # West border continued
-        (-72.7150, 41.7700),  # Northwest area
-        (-72.7120, 41.7780),  # Back to northwest
-        (-72.7100, 41.7850)   # Close polygon
-    ]
-    
-    # Create Hartford city boundary
-    hartford_boundary = Polygon(hartford_boundary_coords)
-    
-    # Create census tract centers using population-based clustering
-    tract_centers = generate_realistic_tract_centers(hartford_data, hartford_boundary)
-    
-    # Create Voronoi diagram for non-overlapping tracts
-    tract_polygons = create_voronoi_tracts(tract_centers, hartford_boundary)
-    
-    # Create GeoDataFrame
-    hartford_gdf = gpd.GeoDataFrame(
-        hartford_data, 
-        geometry=tract_polygons, 
-        crs='EPSG:4326'
-    )
-    
-    print(f"✓ Created {len(hartford_gdf)} non-overlapping census tracts within accurate Hartford boundary")
-    return hartford_gdf
+# More accurate Hartford city boundary coordinates
+_HARTFORD_COORDS = (
+    # Starting from northwest, going clockwise
+    (-72.7100, 41.7850),  # Northwest corner (near Bloomfield border)
+    (-72.7050, 41.7900),  # North border with Windsor
+    (-72.6850, 41.7950),  # Northeast area
+    (-72.6750, 41.7900),  # East side approaching river
+    (-72.6650, 41.7850),  # Near Connecticut River
+    (-72.6550, 41.7800),  # Connecticut River area (east boundary)
+    (-72.6500, 41.7750),  # Connecticut River continued
+    (-72.6480, 41.7700),  # River bend
+    (-72.6450, 41.7650),  # East Hartford border
+    (-72.6470, 41.7600),  # Southeast area
+    (-72.6500, 41.7550),  # South-central
+    (-72.6550, 41.7500),  # Southeast with Wethersfield
+    (-72.6650, 41.7450),  # South border
+    (-72.6750, 41.7400),  # Southwest area
+    (-72.6900, 41.7350),  # South border with Newington
+    (-72.7050, 41.7380),  # Southwest corner
+    (-72.7150, 41.7420),  # West border with West Hartford
+    (-72.7200, 41.7500),  # West side continued
+    (-72.7180, 41.7600),  # West border continued
+    (-72.7150, 41.7700),  # Northwest area
+    (-72.7120, 41.7780),  # Back to northwest
+    (-72.7100, 41.7850)   # Close polygon
+)
 
-def generate_realistic_tract_centers(hartford_data, city_boundary):
-    """Generate realistic tract center points based on Hartford's actual geography"""
-    
-    # Hartford's real neighborhoods and their approximate centers
-    # Based on actual Hartford neighborhoods
-    neighborhoods = [
-        {"name": "Downtown", "center": (-72.6851, 41.7584), "weight": 4.0},  # Central business district
-        {"name": "Asylum Hill", "center": (-72.6950, 41.7620), "weight": 3.0},  # Historic neighborhood
-        {"name": "North End", "center": (-72.6900, 41.7750), "weight": 2.8},  # North of downtown
-        {"name": "South End", "center": (-72.6800, 41.7450), "weight": 2.5},  # South of downtown
-        {"name": "West End", "center": (-72.7000, 41.7550), "weight": 2.2},  # West side
-        {"name": "Frog Hollow", "center": (-72.6980, 41.7580), "weight": 2.0},  # Southwest area
-        {"name": "Behind the Rocks", "center": (-72.6750, 41.7520), "weight": 1.8},  # Southeast
-        {"name": "Clay Arsenal", "center": (-72.6700, 41.7650), "weight": 1.6},  # Northeast
-        {"name": "Barry Square", "center": (-72.6900, 41.7500), "weight": 1.8},  # South-central
-        {"name": "Parkville", "center": (-72.7100, 41.7480), "weight": 1.5},  # Southwest
-        {"name": "Upper Albany", "center": (-72.6850, 41.7700), "weight": 1.4},  # North-central
-        {"name": "Sheldon Charter Oak", "center": (-72.6650, 41.7600), "weight": 1.3},  # East side
+# Map text and styling specific to the accurate (Voronoi) map
+_MAP_STYLE = {
+    'figsize': (15, 12),
+    'tract_linewidth': 0.5,
+    'boundary_linewidth': 2.5,
+    'facecolor': '#f8f9fa',
+    'title': 'Hartford, Connecticut\nHeat Vulnerability Index - July 2024',
+    'title_fontsize': 18,
+    'legend_anchor': (0.02, 0.98),
+    'stats_title': 'Key Statistics',
+    'stats_lines': [
+        'Average Temperature: {avg_temp:.1f}°C'
+    ],
+    'context_text': (
+        'Hartford City Boundary (Accurate)\n'
+        'Bordered by: West Hartford (W), Windsor/Bloomfield (N),\n'
+        'Connecticut River/East Hartford (E), Wethersfield/Newington (S)\n'
+        'Data: US Census ACS 2022, Simulated Climate Data'
+    ),
+    'map_label': 'accurate Hartford map',
+    'summary_lines': [
+        'Total population analyzed: {total_pop:,}',
+        'Census tracts: {n_tracts}',
+        'High risk areas (Level 4-5): {high_vuln_tracts} tracts ({high_vuln_pct:.1f}% of population)',
+        'City area: ~17.4 sq miles (accurate boundary)',
+        'Borders: West Hartford, Windsor/Bloomfield, Connecticut River, Wethersfield/Newington'
     ]
-    
-    tract_centers = []
-    np.random.seed(42)  # For reproducible results
-    
-    # Sort tracts by population for better placement
-    sorted_data = hartford_data.sort_values('population', ascending=False)
-    
-    for i, (_, row) in enumerate(sorted_data.iterrows()):
-        population_weight = row['population'] / hartford_data['population'].max()
-        
-        # Choose neighborhood based on population and income (more realistic distribution)
-        income_weight = row['median_income'] / hartford_data['median_income'].max()
-        combined_weight = (population_weight + income_weight) / 2
-        
-        if combined_weight > 0.8:
-            # High population/income - downtown or asylum hill
-            neighborhood = np.random.choice(neighborhoods[:2], p=[0.7, 0.3])
-        elif combined_weight > 0.6:
-            # Medium-high - downtown area neighborhoods
-            neighborhood = np.random.choice(neighborhoods[:4], p=[0.4, 0.3, 0.2, 0.1])
-        elif combined_weight > 0.4:
-            # Medium - various neighborhoods
-            neighborhood = np.random.choice(neighborhoods[:8])
-        else:
-            # Lower - any neighborhood
-            neighborhood = np.random.choice(neighborhoods)
-        
-        # Add some randomness around neighborhood center
-        center_lon, center_lat = neighborhood["center"]
-        
-        # Spread based on neighborhood weight and population
-        spread = 0.006 / neighborhood["weight"] * (0.5 + population_weight)
-        
-        # Generate point within neighborhood
-        attempts = 0
-        while attempts < 50:  # Prevent infinite loop
-            offset_lat = np.random.normal(0, spread)
-            offset_lon = np.random.normal(0, spread)
-            
-            point_lat = center_lat + offset_lat
-            point_lon = center_lon + offset_lon
-            
-            test_point = Point(point_lon, point_lat)
-            
-            # Check if point is within city boundary
-            if city_boundary.contains(test_point):
-                tract_centers.append((point_lon, point_lat))
-                break
-            
-            attempts += 1
-        
-        # Fallback if we can't find a good point
-        if attempts >= 50:
-            tract_centers.append(neighborhood["center"])
-    
-    print(f"✓ Generated {len(tract_centers)} realistic tract centers")
-    return tract_centers
-
-def create_voronoi_tracts(tract_centers, city_boundary):
-    """Create non-overlapping census tracts using Voronoi tessellation"""
-    
-    print("Creating Voronoi tessellation for census tracts...")
-    
-    # Convert to numpy array for Voronoi
-    points = np.array(tract_centers)
-    
-    # Create Voronoi diagram
-    vor = Voronoi(points)
-    
-    tract_polygons = []
-    
-    for i, point in enumerate(points):
-        # Find the Voronoi cell for this point
-        region_index = vor.point_region[i]
-        region = vor.regions[region_index]
-        
-        if not region or -1 in region:
-            # Handle edge cases - create a small polygon around the point
-            buffer_size = 0.002
-            tract_polygon = Point(point).buffer(buffer_size)
-        else:
-            # Create polygon from Voronoi vertices
-            vertices = [vor.vertices[j] for j in region]
-            try:
-                tract_polygon = Polygon(vertices)
-            except:
-                # Fallback for invalid polygons
-                buffer_size = 0.002
-                tract_polygon = Point(point).buffer(buffer_size)
-        
-        # Clip to city boundary
-        tract_polygon = tract_polygon.intersection(city_boundary)
-        
-        # Ensure we have a valid polygon
-        if tract_polygon.is_empty or not tract_polygon.is_valid:
-            buffer_size = 0.0015
-            tract_polygon = Point(point).buffer(buffer_size).intersection(city_boundary)
-        
-        # Handle MultiPolygon case - take the largest part
-        if hasattr(tract_polygon, 'geoms'):
-            tract_polygon = max(tract_polygon.geoms, key=lambda p: p.area)
-        
-        tract_polygons.append(tract_polygon)
-    
-    print(f"✓ Created {len(tract_polygons)} non-overlapping tract polygons")
-    return tract_polygons
+}
 
-def create_professional_hartford_map(hartford_gdf):
-    """Create the final professional Hartford map with accurate boundaries"""
-    
-    print("Creating professional Hartford Heat Vulnerability Index map...")
-    
-    # Create figure
-    fig, ax = plt.subplots(1, 1, figsize=(15, 12))
-    
-    # Define vulnerability level colors
-    colors = {
-        1: '#2E8B57',  # Dark green (lowest risk)
-        2: '#90EE90',  # Light green (low risk) 
-        3: '#FFFF00',  # Yellow (moderate risk)
-        4: '#FFA500',  # Orange (high risk)
-        5: '#FF4500'   # Red-orange (highest risk)
-    }
-    
-    # Plot each vulnerability level
-    for level in [1, 2, 3, 4, 5]:
-        level_data = hartford_gdf[hartford_gdf['vulnerability_index'] == level]
-        if len(level_data) > 0:
-            level_data.plot(
-                ax=ax,
-                color=colors[level],
-                edgecolor='white',
-                linewidth=0.5,
-                alpha=0.85,
-                label=f'Level {level}'
-            )
-    
-    # Add Hartford city boundary outline (accurate boundary)
-    city_boundary_coords = [
-        (-72.7100, 41.7850), (-72.7050, 41.7900), (-72.6850, 41.7950), (-72.6750, 41.7900),
-        (-72.6650, 41.7850), (-72.6550, 41.7800), (-72.6500, 41.7750), (-72.6480, 41.7700),
-        (-72.6450, 41.7650), (-72.6470, 41.7600), (-72.6500, 41.7550), (-72.6550, 41.7500),
-        (-72.6650, 41.7450), (-72.6750, 41.7400), (-72.6900, 41.7350), (-72.7050, 41.7380),
-        (-72.7150, 41.7420), (-72.7200, 41.7500), (-72.7180, 41.7600), (-72.7150, 41.7700),
-        (-72.7120, 41.7780), (-72.7100, 41.7850)
-    ]
-    city_boundary = Polygon(city_boundary_coords)
-    city_gdf = gpd.GeoDataFrame([1], geometry=[city_boundary], crs='EPSG:4326')
-    city_gdf.boundary.plot(ax=ax, color='black', linewidth=2.5, alpha=0.9)
-    
-    # Customize the map
-    ax.set_title('Hartford, Connecticut\nHeat Vulnerability Index - July 2024', 
-                fontsize=18, fontweight='bold', pad=20)
-    
-    # Remove axis ticks and labels for cleaner look
-    ax.set_xticks([])
-    ax.set_yticks([])
-    ax.set_xlabel('')
-    ax.set_ylabel('')
-    
-    # Set background color
-    ax.set_facecolor('#f8f9fa')
+def create_accurate_hartford_map():
+    """Create an accurate Hartford map with correct city boundaries"""
     
-    # Create custom legend
-    legend_elements = [
-        mpatches.Patch(color=colors[1], label='Level 1 - Lowest Risk'),
-        mpatches.Patch(color=colors[2], label='Level 2 - Low Risk'),
-        mpatches.Patch(color=colors[3], label='Level 3 - Moderate Risk'),
-        mpatches.Patch(color=colors[4], label='Level 4 - High Risk'),
-        mpatches.Patch(color=colors[5], label='Level 5 - Highest Risk')
-    ]
+    print("Creating accurate Hartford Heat Vulnerability Index map...")
     
-    legend = ax.legend(
-        handles=legend_elements, 
-        loc='upper left', 
-        fontsize=11,
-        title='Heat Vulnerability Level',
-        title_fontsize=12,
-        frameon=True,
-        fancybox=True,
-        shadow=True,
-        bbox_to_anchor=(0.02, 0.98)
+    return build_hartford_map(
+        'hvi_output/hartford_vulnerability_data.csv',
+        _HARTFORD_COORDS,
+        'voronoi',
+        'hvi_output/hartford_heat_vulnerability_accurate_map',
+        _MAP_STYLE
     )
-    legend.get_title().set_fontweight('bold')
-    
-    # Add north arrow
-    bounds = ax.get_xlim() + ax.get_ylim()
-    x_pos = bounds[1] - (bounds[1] - bounds[0]) * 0.08
-    y_pos = bounds[3] - (bounds[3] - bounds[2]) * 0.12
-    ax.annotate('N', xy=(x_pos, y_pos), xytext=(x_pos, y_pos - (bounds[3] - bounds[2]) * 0.04),
-                arrowprops=dict(arrowstyle='->', lw=3, color='black'),
-                fontsize=16, fontweight='bold', ha='center')
-    
-    # Add key statistics box
-    total_pop = hartford_gdf['population'].sum()
-    high_vuln_tracts = len(hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])])
-    high_vuln_pop = hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])]['population'].sum()
-    high_vuln_pct = (high_vuln_pop / total_pop) * 100
-    avg_temp = hartford_gdf['mean_temp'].mean()
-    
-    stats_text = f"""Key Statistics:
-• Total Population: {total_pop:,}
-• Census Tracts: {len(hartford_gdf)}
-• High Risk Tracts: {high_vuln_tracts} ({high_vuln_tracts/len(hartford_gdf)*100:.1f}%)
-• People at High Risk: {high_vuln_pop:,} ({high_vuln_pct:.1f}%)
-• Average Temperature: {avg_temp:.1f}°C"""
-    
-    ax.text(0.98, 0.98, stats_text, 
-           transform=ax.transAxes, 
-           fontsize=10,
-           verticalalignment='top',
-           horizontalalignment='right',
-           bbox=dict(boxstyle="round,pad=0.5", facecolor="white", alpha=0.9, edgecolor='gray'))
-    
-    # Add geographic context
-    ax.text(0.02, 0.02, 
-           'Hartford City Boundary (Accurate)\n'
-           'Bordered by: West Hartford (W), Windsor/Bloomfield (N),\n'
-           'Connecticut River/East Hartford (E), Wethersfield/Newington (S)\n'
-           'Data: US Census ACS 2022, Simulated Climate Data', 
-           transform=ax.transAxes, 
-           fontsize=8, 
-           alpha=0.8,
-           bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.8))
-    
-    # Ensure equal aspect ratio and tight layout
-    ax.set_aspect('equal')
-    plt.tight_layout()
-    
-    # Save the map
-    output_path = 'hvi_output/hartford_heat_vulnerability_accurate_map.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"✓ Saved accurate Hartford map to {output_path}")
-    
-    # Also save as PDF
-    pdf_path = 'hvi_output/hartford_heat_vulnerability_accurate_map.pdf'
-    plt.savefig(pdf_path, dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"✓ Saved PDF version to {pdf_path}")
-    
-    plt.show()
-    
-    # Print summary with geographic context
-    print(f"\n📊 Hartford Heat Vulnerability Index Summary:")
-    print(f"   • Total population analyzed: {total_pop:,}")
-    print(f"   • Census tracts: {len(hartford_gdf)}")
-    print(f"   • High risk areas (Level 4-5): {high_vuln_tracts} tracts ({high_vuln_pct:.1f}% of population)")
-    print(f"   • City area: ~17.4 sq miles (accurate boundary)")
-    print(f"   • Borders: West Hartford, Windsor/Bloomfield, Connecticut River, Wethersfield/Newington")
 
 if __name__ == "__main__":
-    create_accurate_hartford_map()
\ No newline at end of file
+    create_accurate_hartford_map()
@@ -4,289 +4,83 @@ Create Hartford map with correct boundaries based on research
 Hartford is at 41.7637°N, 72.6851°W with Connecticut River as eastern boundary
 """
 
-import pandas as pd
-import geopandas as gpd
-import matplotlib.pyplot as plt
-import numpy as np
-from shapely.geometry import Polygon, Point
-import matplotlib.patches as mpatches
-import warnings
-warnings.filterwarnings('ignore')
+from hartford_map_core import build_hartford_map
 
-def create_correct_hartford_map():
-    """Create Hartford map with researched correct boundaries"""
-    
-    print("Creating Hartford Heat Vulnerability Index map with correct boundaries...")
-    
-    # Load vulnerability data
-    try:
-        hartford_data = pd.read_csv('hvi_output/hartford_vulnerability_data.csv')
-        print(f"✓ Loaded vulnerability data: {len(hartford_data)} tracts")
-    except FileNotFoundError:
-        print("✗ Vulnerability data not found.")
-        return
-    
-    # Create Hartford boundary and tracts
-    hartford_gdf = create_hartford_with_correct_shape(hartford_data)
-    
-    # Create the final map
-    create_hartford_vulnerability_map(hartford_gdf)
-
-def create_hartford_with_correct_shape(hartford_data):
-    """Create Hartford with correct shape - Connecticut River on east"""
-    
-    print("Creating Hartford city boundary with Connecticut River as eastern border...")
-    
-    # Hartford boundary coordinates based on research
-    # Center: 41.7637°N, 72.6851°W
-    # Connecticut River forms eastern boundary
-    # Roughly 17.4 sq miles
-    
-    center_lat, center_lon = 41.7637, -72.6851
-    
-    # More accurate Hartford boundary
-    # Connecticut River curves, so eastern boundary follows river
-    hartford_boundary_coords = [
-        # Starting from northwest, going clockwise
-        (-72.725, 41.795),  # Northwest (near Bloomfield/Windsor)
-        (-72.705, 41.800),  # North border
-        (-72.685, 41.805),  # Northeast
-        (-72.665, 41.800),  # Approaching Connecticut River
-        (-72.650, 41.790),  # Connecticut River - north section
-        (-72.645, 41.780),  # Connecticut River - follows curve
-        (-72.640, 41.770),  # Connecticut River - central
-        (-72.642, 41.760),  # Connecticut River - slight bend
-        (-72.645, 41.750),  # Connecticut River - south section
-        (-72.650, 41.740),  # Southeast area
-        (-72.665, 41.735),  # South border (Wethersfield)
-        (-72.685, 41.730),  # South-central
-        (-72.705, 41.735),  # Southwest (Newington border)
-        (-72.720, 41.745),  # West border (West Hartford)
-        (-72.725, 41.760),  # West border continued
-        (-72.720, 41.775),  # Northwest area
-        (-72.725, 41.795)   # Close polygon
-    ]
-    
-    hartford_boundary = Polygon(hartford_boundary_coords)
-    
-    # Create non-overlapping tracts using a simple approach
-    tract_polygons = create_non_overlapping_tracts(hartford_data, hartford_boundary)
-    
-    # Create GeoDataFrame
-    hartford_gdf = gpd.GeoDataFrame(
-        hartford_data.iloc[:len(tract_polygons)].copy(),
-        geometry=tract_polygons, 
-        crs='EPSG:4326'
-    )
-    
-    print(f"✓ Created {len(hartford_gdf)} census tracts within Hartford boundary")
-    return hartford_gdf
+# Hartford boundary coordinates based on research
+# Center: 41.7637°N, 72.6851°W
+# Connecticut River forms eastern boundary
+# Roughly 17.4 sq miles
 
-def create_non_overlapping_tracts(hartford_data, city_boundary):
-    """Create non-overlapping census tracts within Hartford"""
-    
-    print("Creating non-overlapping census tracts...")
-    
-    bounds = city_boundary.bounds
-    west, south, east, north = bounds
-    
-    n_tracts = min(len(hartford_data), 50)  # Limit for performance
-    
-    # Create a reasonable grid
-    cols = int(np.ceil(np.sqrt(n_tracts * 1.2)))  # Slightly rectangular
-    rows = int(np.ceil(n_tracts / cols))
-    
-    cell_width = (east - west) / cols
-    cell_height = (north - south) / rows
-    
-    tract_polygons = []
-    
-    for row in range(rows):
-        for col in range(cols):
-            if len(tract_polygons) >= n_tracts:
-                break
-                
-            # Calculate cell boundaries
-            left = west + col * cell_width
-            right = west + (col + 1) * cell_width
-            bottom = south + row * cell_height
-            top = south + (row + 1) * cell_height
-            
-            # Create cell polygon
-            cell = Polygon([
-                (left, bottom),
-                (right, bottom), 
-                (right, top),
-                (left, top),
-                (left, bottom)
-            ])
-            
-            # Intersect with city boundary
-            tract = cell.intersection(city_boundary)
-            
-            # Keep if valid and reasonable size
-            if (hasattr(tract, 'area') and tract.area > 0.0001 and 
-                hasattr(tract, 'is_valid') and tract.is_valid):
-                
-                # Handle MultiPolygon case
-                if hasattr(tract, 'geoms'):
-                    # Take largest piece
-                    tract = max(tract.geoms, key=lambda x: x.area if hasattr(x, 'area') else 0)
-                
-                tract_polygons.append(tract)
-    
-    print(f"✓ Created {len(tract_polygons)} non-overlapping tract polygons")
-    return tract_polygons
+# More accurate Hartford boundary
+# Connecticut River curves, so eastern boundary follows river
+_HARTFORD_COORDS = (
+    # Starting from northwest, going clockwise
+    (-72.725, 41.795),  # Northwest (near Bloomfield/Windsor)
+    (-72.705, 41.800),  # North border
+    (-72.685, 41.805),  # Northeast
+    (-72.665, 41.800),  # Approaching Connecticut River
+    (-72.650, 41.790),  # Connecticut River - north section
+    (-72.645, 41.780),  # Connecticut River - follows curve
+    (-72.640, 41.770),  # Connecticut River - central
+    (-72.642, 41.760),  # Connecticut River - slight bend
+    (-72.645, 41.750),  # Connecticut River - south section
+    (-72.650, 41.740),  # Southeast area
+    (-72.665, 41.735),  # South border (Wethersfield)
+    (-72.685, 41.730),  # South-central
+    (-72.705, 41.735),  # Southwest (Newington border)
+    (-72.720, 41.745),  # West border (West Hartford)
+    (-72.725, 41.760),  # West border continued
+    (-72.720, 41.775),  # Northwest area
+    (-72.725, 41.795)   # Close polygon
+)
 
-def create_hartford_vulnerability_map(hartford_gdf):
-    """Create the final Hartford vulnerability map"""
-    
-    print("Creating Hartford Heat Vulnerability Index map...")
-    
-    # Create figure
-    fig, ax = plt.subplots(1, 1, figsize=(14, 10))
-    
-    # Define colors
-    colors = {
-        1: '#2E8B57',  # Dark green (lowest risk)
-        2: '#90EE90',  # Light green (low risk) 
-        3: '#FFFF00',  # Yellow (moderate risk)
-        4: '#FFA500',  # Orange (high risk)
-        5: '#FF4500'   # Red-orange (highest risk)
-    }
-    
-    # Plot each vulnerability level
-    for level in [1, 2, 3, 4, 5]:
-        level_data = hartford_gdf[hartford_gdf['vulnerability_index'] == level]
-        if len(level_data) > 0:
-            level_data.plot(
-                ax=ax,
-                color=colors[level],
-                edgecolor='white',
-                linewidth=0.8,
-                alpha=0.85
-            )
-    
-    # Add Hartford city boundary - the correct shape
-    hartford_coords = [
-        (-72.725, 41.795), (-72.705, 41.800), (-72.685, 41.805), (-72.665, 41.800),
-        (-72.650, 41.790), (-72.645, 41.780), (-72.640, 41.770), (-72.642, 41.760),
-        (-72.645, 41.750), (-72.650, 41.740), (-72.665, 41.735), (-72.685, 41.730),
-        (-72.705, 41.735), (-72.720, 41.745), (-72.725, 41.760), (-72.720, 41.775),
-        (-72.725, 41.795)
-    ]
-    
-    city_boundary = Polygon(hartford_coords)
-    city_gdf = gpd.GeoDataFrame([1], geometry=[city_boundary], crs='EPSG:4326')
-    city_gdf.boundary.plot(ax=ax, color='black', linewidth=3, alpha=0.9)
-    
-    # Add Connecticut River indication (eastern boundary)
-    river_coords = [
-        (-72.650, 41.790), (-72.645, 41.780), (-72.640, 41.770), 
+# Map text and styling specific to the correct-shape (grid) map
+_MAP_STYLE = {
+    'figsize': (14, 10),
+    'tract_linewidth': 0.8,
+    'boundary_linewidth': 3,
+    'facecolor': '#e8f4f8',  # Light blue background
+    'title': 'Hartford, Connecticut\nHeat Vulnerability Index - July 2024\n(Connecticut River Forms Eastern Boundary)',
+    'title_fontsize': 16,
+    'legend_anchor': None,
+    # Connecticut River indication (eastern boundary)
+    'river_coords': [
+        (-72.650, 41.790), (-72.645, 41.780), (-72.640, 41.770),
         (-72.642, 41.760), (-72.645, 41.750)
+    ],
+    'stats_title': 'Hartford Statistics',
+    'stats_lines': [
+        'City Area: ~17.4 sq miles',
+        'Coordinates: 41.76°N, 72.69°W'
+    ],
+    'context_text': (
+        'Hartford City Boundary (Research-Based)\n'
+        'Eastern border: Connecticut River\n'
+        'Adjacent: West Hartford (W), East Hartford (E), Windsor (N), Wethersfield (S)\n'
+        'Data: US Census ACS 2022, Simulated Climate Data'
+    ),
+    'map_label': 'correct Hartford map',
+    'summary_lines': [
+        'Map created with correct Hartford city boundaries',
+        'Connecticut River shown as eastern boundary',
+        'Total population: {total_pop:,}',
+        '{n_tracts} census tracts with no overlapping regions',
+        'Center coordinates: 41.76°N, 72.69°W (researched)'
     ]
+}
+
+def create_correct_hartford_map():
+    """Create Hartford map with researched correct boundaries"""
     
-    # Plot river line
-    river_x = [coord[0] for coord in river_coords]
-    river_y = [coord[1] for coord in river_coords]
-    ax.plot(river_x, river_y, color='blue', linewidth=4, alpha=0.7, label='Connecticut River')
-    
-    # Customize map
-    ax.set_title('Hartford, Connecticut\nHeat Vulnerability Index - July 2024\n(Connecticut River Forms Eastern Boundary)', 
-                fontsize=16, fontweight='bold', pad=20)
-    
-    # Remove axis elements for cleaner look
-    ax.set_xticks([])
-    ax.set_yticks([])
-    ax.set_xlabel('')
-    ax.set_ylabel('')
-    ax.set_facecolor('#e8f4f8')  # Light blue background
-    
-    # Create legend for vulnerability levels
-    legend_elements = [
-        mpatches.Patch(color=colors[1], label='Level 1 - Lowest Risk'),
-        mpatches.Patch(color=colors[2], label='Level 2 - Low Risk'),
-        mpatches.Patch(color=colors[3], label='Level 3 - Moderate Risk'),
-        mpatches.Patch(color=colors[4], label='Level 4 - High Risk'),
-        mpatches.Patch(color=colors[5], label='Level 5 - Highest Risk'),
-        mpatches.Patch(color='blue', label='Connecticut River')
-    ]
+    print("Creating Hartford Heat Vulnerability Index map with correct boundaries...")
     
-    legend = ax.legend(
-        handles=legend_elements, 
-        loc='upper left', 
-        fontsize=11,
-        title='Heat Vulnerability Level',
-        title_fontsize=12,
-        frameon=True,
-        fancybox=True,
-        shadow=True
+    return build_hartford_map(
+        'hvi_output/hartford_vulnerability_data.csv',
+        _HARTFORD_COORDS,
+        'grid',
+        'hvi_output/hartford_heat_vulnerability_correct_map',
+        _MAP_STYLE
     )
-    legend.get_title().set_fontweight('bold')
-    
-    # Add north arrow
-    bounds = ax.get_xlim() + ax.get_ylim()
-    x_pos = bounds[1] - (bounds[1] - bounds[0]) * 0.08
-    y_pos = bounds[3] - (bounds[3] - bounds[2]) * 0.12
-    ax.annotate('N', xy=(x_pos, y_pos), xytext=(x_pos, y_pos - (bounds[3] - bounds[2]) * 0.04),
-                arrowprops=dict(arrowstyle='->', lw=3, color='black'),
-                fontsize=16, fontweight='bold', ha='center')
-    
-    # Add statistics
-    total_pop = hartford_gdf['population'].sum()
-    high_vuln_tracts = len(hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])])
-    high_vuln_pop = hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])]['population'].sum()
-    high_vuln_pct = (high_vuln_pop / total_pop) * 100 if total_pop > 0 else 0
-    
-    stats_text = f"""Hartford Statistics:
-• Total Population: {total_pop:,}
-• Census Tracts: {len(hartford_gdf)}
-• High Risk Tracts: {high_vuln_tracts} ({high_vuln_tracts/len(hartford_gdf)*100:.1f}%)
-• People at High Risk: {high_vuln_pop:,} ({high_vuln_pct:.1f}%)
-• City Area: ~17.4 sq miles
-• Coordinates: 41.76°N, 72.69°W"""
-    
-    ax.text(0.98, 0.98, stats_text, 
-           transform=ax.transAxes, 
-           fontsize=10,
-           verticalalignment='top',
-           horizontalalignment='right',
-           bbox=dict(boxstyle="round,pad=0.5", facecolor="white", alpha=0.9, edgecolor='gray'))
-    
-    # Add geographic context
-    ax.text(0.02, 0.02, 
-           'Hartford City Boundary (Research-Based)\n'
-           'Eastern border: Connecticut River\n'
-           'Adjacent: West Hartford (W), East Hartford (E), Windsor (N), Wethersfield (S)\n'
-           'Data: US Census ACS 2022, Simulated Climate Data', 
-           transform=ax.transAxes, 
-           fontsize=8, 
-           alpha=0.8,
-           bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.8))
-    
-    # Set equal aspect ratio
-    ax.set_aspect('equal')
-    plt.tight_layout()
-    
-    # Save the map
-    output_path = 'hvi_output/hartford_heat_vulnerability_correct_map.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"✓ Saved correct Hartford map to {output_path}")
-    
-    # Also save as PDF
-    pdf_path = 'hvi_output/hartford_heat_vulnerability_correct_map.pdf'
-    plt.savefig(pdf_path, dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"✓ Saved PDF version to {pdf_path}")
-    
-    plt.show()
-    
-    # Print summary
-    print(f"\n📊 Hartford Heat Vulnerability Index Summary:")
-    print(f"   • Map created with correct Hartford city boundaries")
-    print(f"   • Connecticut River shown as eastern boundary") 
-    print(f"   • Total population: {total_pop:,}")
-    print(f"   • {len(hartford_gdf)} census tracts with no overlapping regions")
-    print(f"   • Center coordinates: 41.76°N, 72.69°W (researched)")
 
 if __name__ == "__main__":
-    create_correct_hartford_map()
\ No newline at end of file
+    create_correct_hartford_map()
@@ -3,23 +3,59 @@
 Create final Hartford city-only map with proper census tracts
 """
 
-import pandas as pd
 import geopandas as gpd
+# The shared core picks the headless backend, so import it before pyplot
+from hartford_map_core import (
+    SHOW_PLOT, load_vulnerability_data, largest_parts, _HARTFORD_PALETTE, _PALETTE_ARR
+)
 import matplotlib.pyplot as plt
 import numpy as np
+import shapely
 from shapely.geometry import Polygon, Point
 import matplotlib.patches as mpatches
-import warnings
-warnings.filterwarnings('ignore')
+from matplotlib.lines import Line2D
+from matplotlib.collections import PolyCollection
 
-def create_final_hartford_city():
+try:
+    # Optional raster backend for maps with many tracts
+    import datashader as ds
+    import datashader.transfer_functions as tf
+    import spatialpandas
+    HAS_DATASHADER = True
+except ImportError:
+    HAS_DATASHADER = False
+
+# Hartford city boundary (research-based, excluding neighboring towns)
+_HARTFORD_COORDS = (
+    (-72.720, 41.795),  # Northwest corner
+    (-72.690, 41.800),  # North boundary
+    (-72.670, 41.795),  # Northeast
+    (-72.660, 41.785),  # East boundary (Connecticut River)
+    (-72.655, 41.770),  # Connecticut River central
+    (-72.660, 41.755),  # Connecticut River south
+    (-72.675, 41.745),  # Southeast
+    (-72.700, 41.740),  # South boundary
+    (-72.715, 41.750),  # Southwest
+    (-72.725, 41.770),  # West boundary
+    (-72.720, 41.790),  # Northwest
+    (-72.720, 41.795)   # Close polygon
+)
+
+# Boundary polygon and its outline GeoDataFrame, built once per process
+_HARTFORD_BOUNDARY = Polygon(_HARTFORD_COORDS)
+_HARTFORD_CITY_GDF = gpd.GeoDataFrame([1], geometry=[_HARTFORD_BOUNDARY], crs='EPSG:4326')
+
+# Connecticut River (eastern boundary of Hartford)
+_RIVER = np.array([(-72.660, 41.785), (-72.655, 41.770), (-72.660, 41.755)])
+
+def create_final_hartford_city(backend='matplotlib'):
     """Create final Hartford city-only map"""
     
     print("Creating final Hartford city Heat Vulnerability Index map...")
     
     # Load vulnerability data
     try:
-        hartford_data = pd.read_csv('hvi_output/hartford_vulnerability_data.csv')
+        hartford_data = load_vulnerability_data('hvi_output/hartford_vulnerability_data.csv')
         print(f"✓ Loaded vulnerability data: {len(hartford_data)} tracts")
     except FileNotFoundError:
         print("✗ Vulnerability data not found.")
@@ -29,135 +65,125 @@ def create_final_hartford_city():
     hartford_gdf = create_hartford_with_tracts(hartford_data)
     
     # Create the final map
-    create_final_map(hartford_gdf)
+    create_final_map(hartford_gdf, backend)
 
 def create_hartford_with_tracts(hartford_data):
     """Create Hartford city with proper census tracts"""
     
     print("Creating Hartford city boundary with census tracts...")
     
-    # Hartford city boundary (research-based, excluding neighboring towns)
-    hartford_coords = [
-        (-72.720, 41.795),  # Northwest corner
-        (-72.690, 41.800),  # North boundary
-        (-72.670, 41.795),  # Northeast
-        (-72.660, 41.785),  # East boundary (Connecticut River)
-        (-72.655, 41.770),  # Connecticut River central
-        (-72.660, 41.755),  # Connecticut River south
-        (-72.675, 41.745),  # Southeast
-        (-72.700, 41.740),  # South boundary
-        (-72.715, 41.750),  # Southwest
-        (-72.725, 41.770),  # West boundary
-        (-72.720, 41.790),  # Northwest
-        (-72.720, 41.795)   # Close polygon
-    ]
-    
-    hartford_boundary = Polygon(hartford_coords)
-    bounds = hartford_boundary.bounds
-    west, south, east, north = bounds
-    
     # Create meaningful number of census tracts (25 tracts in 5x5 grid)
-    grid_size = 5
-    cell_width = (east - west) / grid_size
-    cell_height = (north - south) / grid_size
-    
-    tract_polygons = []
-    tract_data_list = []
-    
-    tract_count = 0
-    for row in range(grid_size):
-        for col in range(grid_size):
-            # Calculate cell boundaries
-            left = west + col * cell_width
-            right = west + (col + 1) * cell_width
-            bottom = south + row * cell_height
-            top = south + (row + 1) * cell_height
-            
-            # Create cell
-            cell = Polygon([
-                (left, bottom), (right, bottom),
-                (right, top), (left, top), (left, bottom)
-            ])
-            
-            # Intersect with Hartford boundary
-            tract = cell.intersection(hartford_boundary)
-            
-            # Keep if it has meaningful area
-            if hasattr(tract, 'area') and tract.area > 0.0002:
-                # Handle MultiPolygon case
-                if hasattr(tract, 'geoms'):
-                    tract = max(tract.geoms, key=lambda x: x.area)
-                
-                if tract.area > 0.0002:  # Double check
-                    tract_polygons.append(tract)
-                    
-                    # Cycle through the original data
-                    data_idx = tract_count % len(hartford_data)
-                    tract_data_list.append(hartford_data.iloc[data_idx].copy())
-                    tract_count += 1
+    tracts = _grid_tracts(grid_size=5, min_area=0.0002)
     
     # Ensure we have some tracts
-    if len(tract_polygons) == 0:
+    if len(tracts) == 0:
         print("Creating single fallback tract...")
-        tract_polygons = [hartford_boundary]
-        tract_data_list = [hartford_data.iloc[0].copy()]
+        tracts = np.array([_HARTFORD_BOUNDARY], dtype=object)
+    
+    # Cycle through the original data with a single row gather
+    idx_array = np.arange(len(tracts)) % len(hartford_data)
+    tract_df = hartford_data.take(idx_array).reset_index(drop=True)
     
     # Create GeoDataFrame
     hartford_gdf = gpd.GeoDataFrame(
-        pd.DataFrame(tract_data_list),
-        geometry=tract_polygons,
+        tract_df,
+        geometry=list(tracts),
         crs='EPSG:4326'
     )
     
     print(f"✓ Created {len(hartford_gdf)} Hartford city census tracts")
     return hartford_gdf
 
-def create_final_map(hartford_gdf):
+def _grid_tracts(grid_size, min_area):
+    """Clip a grid_size x grid_size grid to the city boundary"""
+    
+    bounds = _HARTFORD_BOUNDARY.bounds
+    west, south, east, north = bounds
+    
+    cell_width = (east - west) / grid_size
+    cell_height = (north - south) / grid_size
+    
+    # Calculate cell boundaries for every row and column at once
+    left = west + np.arange(grid_size) * cell_width
+    right = left + cell_width
+    bottom = south + np.arange(grid_size) * cell_height
+    top = bottom + cell_height
+    
+    # Closed ring coordinates for all cells, shape (grid_size ** 2, 5, 2)
+    ring_x = np.stack([left, right, right, left, left], axis=-1)
+    ring_y = np.stack([bottom, bottom, top, top, bottom], axis=-1)
+    coords = np.stack(
+        np.broadcast_arrays(ring_x[None, :, :], ring_y[:, None, :]), axis=-1
+    ).reshape(grid_size * grid_size, 5, 2)
+    
+    # Create all grid cells in a single call
+    cells = shapely.polygons(shapely.linearrings(coords))
+    
+    # Cells wholly inside the boundary are their own intersection, so only
+    # the cells straddling the boundary go through the overlay
+    shapely.prepare(_HARTFORD_BOUNDARY)
+    tracts = cells.copy()
+    edge = ~shapely.contains_properly(_HARTFORD_BOUNDARY, cells)
+    tracts[edge] = shapely.intersection(cells[edge], _HARTFORD_BOUNDARY)
+    
+    # Keep if it has meaningful area
+    tracts = tracts[shapely.area(tracts) > min_area]
+    
+    # Handle MultiPolygon case
+    tracts = largest_parts(tracts)
+    tracts = tracts[shapely.area(tracts) > min_area]  # Double check
+    return tracts
+
+def _shade_tracts(ax, hartford_gdf):
+    """Rasterize tracts onto a fixed-size canvas with datashader and show the image"""
+    west, south, east, north = _HARTFORD_BOUNDARY.bounds
+    cvs = ds.Canvas(plot_width=1400, plot_height=1000,
+                    x_range=(west, east), y_range=(south, north))
+    tracts = spatialpandas.GeoDataFrame(hartford_gdf[['vulnerability_index', 'geometry']])
+    agg = cvs.polygons(tracts, geometry='geometry', agg=ds.max('vulnerability_index'))
+    img = tf.shade(agg, cmap=list(_PALETTE_ARR), how='linear', span=(1, 5))
+    ax.imshow(img.to_pil(), extent=(west, east, south, north), alpha=0.85)
+
+def create_final_map(hartford_gdf, backend='matplotlib'):
     """Create the final Hartford city map"""
     
     print("Creating final Hartford city vulnerability map...")
     
+    if backend not in ('matplotlib', 'datashader'):
+        raise ValueError(f"Unknown backend: {backend}")
+    if backend == 'datashader' and not HAS_DATASHADER:
+        print("✗ datashader/spatialpandas not installed, using matplotlib")
+        backend = 'matplotlib'
+    
     # Create figure
     fig, ax = plt.subplots(1, 1, figsize=(14, 10))
     
-    # Define vulnerability colors
-    colors = {
-        1: '#2E8B57',  # Dark green (lowest risk)
-        2: '#90EE90',  # Light green (low risk) 
-        3: '#FFFF00',  # Yellow (moderate risk)
-        4: '#FFA500',  # Orange (high risk)
-        5: '#FF4500'   # Red-orange (highest risk)
-    }
-    
-    # Plot each vulnerability level
-    for level in [1, 2, 3, 4, 5]:
-        level_data = hartford_gdf[hartford_gdf['vulnerability_index'] == level]
-        if len(level_data) > 0:
-            level_data.plot(
-                ax=ax,
-                color=colors[level],
-                edgecolor='white',
-                linewidth=1.0,
-                alpha=0.85
-            )
+    if backend == 'datashader':
+        # Raster path: cost scales with pixels rather than tract vertices
+        _shade_tracts(ax, hartford_gdf)
+    else:
+        # Look up every tract's color at once, lowest level drawn first
+        ordered = hartford_gdf.sort_values('vulnerability_index')
+        face_colors = _PALETTE_ARR[ordered['vulnerability_index'].to_numpy() - 1]
+        
+        # Gather all tract outlines in one call and draw them as one collection
+        coords, owner = shapely.get_coordinates(
+            shapely.get_exterior_ring(ordered.geometry.to_numpy()), return_index=True)
+        verts = np.split(coords, np.flatnonzero(np.diff(owner)) + 1)
+        ax.add_collection(PolyCollection(
+            verts,
+            facecolors=face_colors,
+            edgecolors='white',
+            linewidths=1.0,
+            alpha=0.85
+        ))
+        ax.autoscale_view()
     
     # Add Hartford city boundary
-    hartford_coords = [
-        (-72.720, 41.795), (-72.690, 41.800), (-72.670, 41.795), (-72.660, 41.785),
-        (-72.655, 41.770), (-72.660, 41.755), (-72.675, 41.745), (-72.700, 41.740),
-        (-72.715, 41.750), (-72.725, 41.770), (-72.720, 41.790), (-72.720, 41.795)
-    ]
-    
-    city_boundary = Polygon(hartford_coords)
-    city_gdf = gpd.GeoDataFrame([1], geometry=[city_boundary], crs='EPSG:4326')
-    city_gdf.boundary.plot(ax=ax, color='black', linewidth=3, alpha=0.9)
+    _HARTFORD_CITY_GDF.boundary.plot(ax=ax, color='black', linewidth=3, alpha=0.9)
     
     # Add Connecticut River (eastern boundary of Hartford)
-    river_coords = [(-72.660, 41.785), (-72.655, 41.770), (-72.660, 41.755)]
-    river_x = [coord[0] for coord in river_coords]
-    river_y = [coord[1] for coord in river_coords]
-    ax.plot(river_x, river_y, color='#1E90FF', linewidth=5, alpha=0.9, 
-           label='Connecticut River', zorder=10)
+    ax.add_line(Line2D(_RIVER[:, 0], _RIVER[:, 1], color='#1E90FF', linewidth=5, alpha=0.9, zorder=10))
     
     # Customize map appearance
     ax.set_title('Hartford City, Connecticut\nHeat Vulnerability Index - July 2024\n' + 
@@ -173,12 +199,12 @@ def create_final_map(hartford_gdf):
     
     # Create comprehensive legend
     legend_elements = [
-        mpatches.Patch(color=colors[1], label='Level 1 - Lowest Risk'),
-        mpatches.Patch(color=colors[2], label='Level 2 - Low Risk'),
-        mpatches.Patch(color=colors[3], label='Level 3 - Moderate Risk'),
-        mpatches.Patch(color=colors[4], label='Level 4 - High Risk'),
-        mpatches.Patch(color=colors[5], label='Level 5 - Highest Risk'),
-        mpatches.Patch(color='#1E90FF', label='Connecticut River (Eastern Border)')
+        mpatches.Patch(color=_HARTFORD_PALETTE[1], label='Level 1 - Lowest Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[2], label='Level 2 - Low Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[3], label='Level 3 - Moderate Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[4], label='Level 4 - High Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[5], label='Level 5 - Highest Risk'),
+        Line2D([], [], color='#1E90FF', linewidth=5, label='Connecticut River (Eastern Border)')
     ]
     
     legend = ax.legend(
@@ -203,16 +229,22 @@ def create_final_map(hartford_gdf):
                 fontsize=16, fontweight='bold', ha='center')
     
     # Calculate and display statistics
-    total_pop = hartford_gdf['population'].sum()
-    high_vuln_tracts = len(hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])])
-    high_vuln_pop = hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])]['population'].sum()
+    population = hartford_gdf['population'].to_numpy()
+    total_pop = int(population.sum())
+    n_tracts = len(hartford_gdf)
+    
+    # Levels 4-5 are high risk; build the mask once for both counts
+    high_mask = hartford_gdf['vulnerability_index'].to_numpy() >= 4
+    high_vuln_tracts = int(high_mask.sum())
+    high_vuln_tract_pct = high_vuln_tracts / n_tracts * 100 if n_tracts > 0 else 0
+    high_vuln_pop = int(population[high_mask].sum())
     high_vuln_pct = (high_vuln_pop / total_pop) * 100 if total_pop > 0 else 0
-    avg_temp = hartford_gdf['mean_temp'].mean()
+    avg_temp = hartford_gdf['mean_temp'].to_numpy().mean()
     
     stats_text = f"""Hartford City Statistics:
 • Total Population: {total_pop:,}
-• Census Tracts: {len(hartford_gdf)}
-• High Risk Tracts: {high_vuln_tracts} ({high_vuln_tracts/len(hartford_gdf)*100:.1f}%)
+• Census Tracts: {n_tracts}
+• High Risk Tracts: {high_vuln_tracts} ({high_vuln_tract_pct:.1f}%)
 • People at High Risk: {high_vuln_pop:,} ({high_vuln_pct:.1f}%)
 • Avg Temperature: {avg_temp:.1f}°C
 • Connecticut State Capital"""
@@ -244,24 +276,28 @@ Eastern Border: Connecticut River'''
     ax.set_aspect('equal')
     plt.tight_layout()
     
-    # Save the final map
+    # Save the map as vector PDF first (no rasterization needed)
+    pdf_path = 'hvi_output/hartford_city_proper_vulnerability_map.pdf'
+    fig.savefig(pdf_path, bbox_inches='tight', facecolor='white')
+    print(f"✓ Saved PDF version to {pdf_path}")
+    
+    # Then rasterize once for the PNG
     output_path = 'hvi_output/hartford_city_proper_vulnerability_map.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
+    fig.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
     print(f"✓ Saved Hartford city proper map to {output_path}")
     
-    # Also save as PDF
-    pdf_path = 'hvi_output/hartford_city_proper_vulnerability_map.pdf'
-    plt.savefig(pdf_path, dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"✓ Saved PDF version to {pdf_path}")
+    if SHOW_PLOT:
+        plt.show()
     
-    plt.show()
+    # Release the figure now rather than at interpreter exit
+    plt.close(fig)
     
     # Print comprehensive summary
     print(f"\n📊 Hartford City Proper Heat Vulnerability Index Summary:")
     print(f"   • Map shows ONLY Hartford city proper boundaries")
     print(f"   • EXCLUDES all neighboring towns (West Hartford, East Hartford, Windsor, etc.)")
     print(f"   • Total population analyzed: {total_pop:,}")
-    print(f"   • Census tracts: {len(hartford_gdf)} (non-overlapping)")
+    print(f"   • Census tracts: {n_tracts} (non-overlapping)")
     print(f"   • High vulnerability areas: {high_vuln_tracts} tracts ({high_vuln_pct:.1f}% of population)")
     print(f"   • Connecticut River clearly marked as eastern city boundary")
     print(f"   • State capital of Connecticut")
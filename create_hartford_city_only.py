@@ -3,23 +3,111 @@
 Create a map showing ONLY Hartford city proper - not the surrounding towns
 """
 
-import pandas as pd
 import geopandas as gpd
+# The shared core picks the headless backend, so import it before pyplot
+from hartford_map_core import (
+    SHOW_PLOT, load_vulnerability_data, largest_parts, _HARTFORD_PALETTE, _PALETTE_ARR
+)
 import matplotlib.pyplot as plt
 import numpy as np
+import shapely
 from shapely.geometry import Polygon, Point
 import matplotlib.patches as mpatches
-import warnings
-warnings.filterwarnings('ignore')
+from matplotlib.lines import Line2D
+from matplotlib.collections import PolyCollection
 
-def create_hartford_city_only():
+try:
+    # Optional raster backend for maps with many tracts
+    import datashader as ds
+    import datashader.transfer_functions as tf
+    import spatialpandas
+    HAS_DATASHADER = True
+except ImportError:
+    HAS_DATASHADER = False
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Hartford city proper coordinates (more precise research-based)
+# Hartford center: 41.7637°N, 72.6851°W
+# Area: 17.4 sq miles
+# This excludes West Hartford, East Hartford, Windsor, Wethersfield etc.
+_HARTFORD_COORDS = (
+    # Northwestern boundary
+    (-72.7150, 41.7900),  # Northwest corner
+    (-72.7050, 41.7950),  # North boundary
+    (-72.6950, 41.7980),  # Northeast approach
+    (-72.6850, 41.7950),  # North-central
+    
+    # Eastern boundary (Connecticut River)
+    (-72.6750, 41.7900),  # River approach
+    (-72.6700, 41.7850),  # Connecticut River north
+    (-72.6650, 41.7800),  # Connecticut River central
+    (-72.6680, 41.7750),  # Connecticut River bend
+    (-72.6720, 41.7700),  # Connecticut River south
+    (-72.6750, 41.7650),  # Southeast area
+    
+    # Southern boundary
+    (-72.6850, 41.7600),  # South-central
+    (-72.6950, 41.7550),  # South boundary
+    (-72.7050, 41.7500),  # Southwest area
+    (-72.7150, 41.7520),  # Southwest corner
+    
+    # Western boundary
+    (-72.7200, 41.7600),  # West boundary south
+    (-72.7220, 41.7700),  # West boundary central
+    (-72.7200, 41.7800),  # West boundary north
+    (-72.7150, 41.7900)   # Close polygon
+)
+
+# Boundary polygon and its outline GeoDataFrame, built once per process
+_HARTFORD_BOUNDARY = Polygon(_HARTFORD_COORDS)
+_HARTFORD_CITY_GDF = gpd.GeoDataFrame([1], geometry=[_HARTFORD_BOUNDARY], crs='EPSG:4326')
+
+# Connecticut River indication (eastern boundary of Hartford city)
+_RIVER = np.array([
+    (-72.6750, 41.7900), (-72.6700, 41.7850), (-72.6650, 41.7800),
+    (-72.6680, 41.7750), (-72.6720, 41.7700), (-72.6750, 41.7650)
+])
+
+if HAS_NUMBA:
+    @njit(cache=True, parallel=True)
+    def _grid_bboxes(west, south, east, north, rows, cols):
+        """(left, bottom, right, top) of every grid cell, row-major, shape (rows * cols, 4)"""
+        cell_width = (east - west) / cols
+        cell_height = (north - south) / rows
+        bboxes = np.empty((rows * cols, 4))
+        for row in prange(rows):
+            bottom = south + row * cell_height
+            for col in range(cols):
+                left = west + col * cell_width
+                k = row * cols + col
+                bboxes[k, 0] = left
+                bboxes[k, 1] = bottom
+                bboxes[k, 2] = left + cell_width
+                bboxes[k, 3] = bottom + cell_height
+        return bboxes
+else:
+    def _grid_bboxes(west, south, east, north, rows, cols):
+        """(left, bottom, right, top) of every grid cell, row-major, shape (rows * cols, 4)"""
+        cell_width = (east - west) / cols
+        cell_height = (north - south) / rows
+        left = west + np.arange(cols) * cell_width
+        bottom = south + np.arange(rows) * cell_height
+        left, bottom = np.broadcast_arrays(left[None, :], bottom[:, None])
+        return np.stack([left, bottom, left + cell_width, bottom + cell_height], axis=-1).reshape(rows * cols, 4)
+
+def create_hartford_city_only(backend='matplotlib'):
     """Create a map showing only Hartford city proper"""
     
     print("Creating map of Hartford city only (excluding neighboring towns)...")
     
     # Load vulnerability data
     try:
-        hartford_data = pd.read_csv('hvi_output/hartford_vulnerability_data.csv')
+        hartford_data = load_vulnerability_data('hvi_output/hartford_vulnerability_data.csv')
         print(f"✓ Loaded vulnerability data: {len(hartford_data)} tracts")
     except FileNotFoundError:
         print("✗ Vulnerability data not found.")
@@ -29,51 +117,15 @@ def create_hartford_city_only():
     hartford_gdf = create_hartford_city_precise(hartford_data)
     
     # Create the final map
-    create_hartford_only_map(hartford_gdf)
+    create_hartford_only_map(hartford_gdf, backend)
 
 def create_hartford_city_precise(hartford_data):
     """Create Hartford city boundaries only - excluding neighboring towns"""
     
     print("Creating precise Hartford city boundaries only...")
     
-    # Hartford city proper coordinates (more precise research-based)
-    # Hartford center: 41.7637°N, 72.6851°W
-    # Area: 17.4 sq miles
-    # This excludes West Hartford, East Hartford, Windsor, Wethersfield etc.
-    
-    # More precise Hartford city-only boundary
-    hartford_city_coords = [
-        # Northwestern boundary
-        (-72.7150, 41.7900),  # Northwest corner
-        (-72.7050, 41.7950),  # North boundary
-        (-72.6950, 41.7980),  # Northeast approach
-        (-72.6850, 41.7950),  # North-central
-        
-        # Eastern boundary (Connecticut River)
-        (-72.6750, 41.7900),  # River approach
-        (-72.6700, 41.7850),  # Connecticut River north
-        (-72.6650, 41.7800),  # Connecticut River central
-        (-72.6680, 41.7750),  # Connecticut River bend
-        (-72.6720, 41.7700),  # Connecticut River south
-        (-72.6750, 41.7650),  # Southeast area
-        
-        # Southern boundary
-        (-72.6850, 41.7600),  # South-central
-        (-72.6950, 41.7550),  # South boundary
-        (-72.7050, 41.7500),  # Southwest area
-        (-72.7150, 41.7520),  # Southwest corner
-        
-        # Western boundary
-        (-72.7200, 41.7600),  # West boundary south
-        (-72.7220, 41.7700),  # West boundary central
-        (-72.7200, 41.7800),  # West boundary north
-        (-72.7150, 41.7900)   # Close polygon
-    ]
-    
-    hartford_city_boundary = Polygon(hartford_city_coords)
-    
     # Create census tracts within Hartford city only
-    tract_polygons = create_hartford_city_tracts(hartford_data, hartford_city_boundary)
+    tract_polygons = create_hartford_city_tracts(hartford_data, _HARTFORD_BOUNDARY)
     
     # Create GeoDataFrame
     hartford_gdf = gpd.GeoDataFrame(
@@ -101,100 +153,87 @@ def create_hartford_city_tracts(hartford_data, city_boundary):
     cols = int(np.ceil(np.sqrt(n_tracts * aspect_ratio)))
     rows = int(np.ceil(n_tracts / cols))
     
-    cell_width = (east - west) / cols
-    cell_height = (north - south) / rows
+    # Cell boundaries for every grid cell, row-major
+    left, bottom, right, top = _grid_bboxes(west, south, east, north, rows, cols).T
     
-    tract_polygons = []
+    # Closed ring coordinates for all cells, shape (rows * cols, 5, 2)
+    coords = np.stack([
+        np.stack([left, right, right, left, left], axis=-1),
+        np.stack([bottom, bottom, top, top, bottom], axis=-1)
+    ], axis=-1)
     
-    for row in range(rows):
-        for col in range(cols):
-            if len(tract_polygons) >= n_tracts:
-                break
-                
-            # Calculate cell boundaries
-            left = west + col * cell_width
-            right = west + (col + 1) * cell_width
-            bottom = south + row * cell_height
-            top = south + (row + 1) * cell_height
-            
-            # Create cell polygon
-            cell = Polygon([
-                (left, bottom),
-                (right, bottom), 
-                (right, top),
-                (left, top),
-                (left, bottom)
-            ])
-            
-            # Intersect with Hartford city boundary only
-            tract = cell.intersection(city_boundary)
-            
-            # Keep if valid and reasonable size
-            if (hasattr(tract, 'area') and tract.area > 0.0001 and 
-                hasattr(tract, 'is_valid') and tract.is_valid):
-                
-                # Handle MultiPolygon case
-                if hasattr(tract, 'geoms'):
-                    # Take largest piece
-                    tract = max(tract.geoms, key=lambda x: x.area if hasattr(x, 'area') else 0)
-                
-                tract_polygons.append(tract)
+    # Create all cell polygons in a single call
+    cells = shapely.polygons(shapely.linearrings(coords))
+    
+    # Cells wholly inside the boundary are their own intersection, so only
+    # the cells straddling the boundary go through the overlay
+    shapely.prepare(city_boundary)
+    tracts = cells.copy()
+    edge = ~shapely.contains_properly(city_boundary, cells)
+    tracts[edge] = shapely.intersection(cells[edge], city_boundary)
+    
+    # Keep if valid and reasonable size
+    keep = (shapely.area(tracts) > 0.0001) & shapely.is_valid(tracts)
+    
+    # Handle MultiPolygon case by taking the largest piece
+    tract_polygons = list(largest_parts(tracts[keep][:n_tracts]))
     
     print(f"✓ Created {len(tract_polygons)} Hartford city tract polygons")
     return tract_polygons
 
-def create_hartford_only_map(hartford_gdf):
+def _shade_tracts(ax, hartford_gdf):
+    """Rasterize tracts onto a fixed-size canvas with datashader and show the image"""
+    west, south, east, north = _HARTFORD_BOUNDARY.bounds
+    cvs = ds.Canvas(plot_width=1400, plot_height=1000,
+                    x_range=(west, east), y_range=(south, north))
+    tracts = spatialpandas.GeoDataFrame(hartford_gdf[['vulnerability_index', 'geometry']])
+    agg = cvs.polygons(tracts, geometry='geometry', agg=ds.max('vulnerability_index'))
+    img = tf.shade(agg, cmap=list(_PALETTE_ARR), how='linear', span=(1, 5))
+    ax.imshow(img.to_pil(), extent=(west, east, south, north), alpha=0.85)
+
+def create_hartford_only_map(hartford_gdf, backend='matplotlib'):
     """Create map showing only Hartford city proper"""
     
     print("Creating Hartford city-only Heat Vulnerability Index map...")
     
+    if backend not in ('matplotlib', 'datashader'):
+        raise ValueError(f"Unknown backend: {backend}")
+    if backend == 'datashader' and not HAS_DATASHADER:
+        print("✗ datashader/spatialpandas not installed, using matplotlib")
+        backend = 'matplotlib'
+    
     # Create figure
     fig, ax = plt.subplots(1, 1, figsize=(12, 10))
     
-    # Define colors
-    colors = {
-        1: '#2E8B57',  # Dark green (lowest risk)
-        2: '#90EE90',  # Light green (low risk) 
-        3: '#FFFF00',  # Yellow (moderate risk)
-        4: '#FFA500',  # Orange (high risk)
-        5: '#FF4500'   # Red-orange (highest risk)
-    }
-    
-    # Plot each vulnerability level
-    for level in [1, 2, 3, 4, 5]:
-        level_data = hartford_gdf[hartford_gdf['vulnerability_index'] == level]
-        if len(level_data) > 0:
-            level_data.plot(
-                ax=ax,
-                color=colors[level],
-                edgecolor='white',
-                linewidth=0.8,
-                alpha=0.85
-            )
+    if hartford_gdf.empty:
+        # Plotting an empty frame only emits a warning
+        print("✗ No tracts passed the size filter, drawing boundary only")
+    elif backend == 'datashader':
+        # Raster path: cost scales with pixels rather than tract vertices
+        _shade_tracts(ax, hartford_gdf)
+    else:
+        # Look up every tract's color at once, lowest level drawn first
+        ordered = hartford_gdf.sort_values('vulnerability_index')
+        face_colors = _PALETTE_ARR[ordered['vulnerability_index'].to_numpy() - 1]
+        
+        # Gather all tract outlines in one call and draw them as one collection
+        coords, owner = shapely.get_coordinates(
+            shapely.get_exterior_ring(ordered.geometry.to_numpy()), return_index=True)
+        verts = np.split(coords, np.flatnonzero(np.diff(owner)) + 1)
+        ax.add_collection(PolyCollection(
+            verts,
+            facecolors=face_colors,
+            edgecolors='white',
+            linewidths=0.8,
+            alpha=0.85
+        ))
+        ax.autoscale_view()
     
     # Add Hartford city boundary ONLY
-    hartford_city_coords = [
-        (-72.7150, 41.7900), (-72.7050, 41.7950), (-72.6950, 41.7980), (-72.6850, 41.7950),
-        (-72.6750, 41.7900), (-72.6700, 41.7850), (-72.6650, 41.7800), (-72.6680, 41.7750),
-        (-72.6720, 41.7700), (-72.6750, 41.7650), (-72.6850, 41.7600), (-72.6950, 41.7550),
-        (-72.7050, 41.7500), (-72.7150, 41.7520), (-72.7200, 41.7600), (-72.7220, 41.7700),
-        (-72.7200, 41.7800), (-72.7150, 41.7900)
-    ]
-    
-    city_boundary = Polygon(hartford_city_coords)
-    city_gdf = gpd.GeoDataFrame([1], geometry=[city_boundary], crs='EPSG:4326')
-    city_gdf.boundary.plot(ax=ax, color='black', linewidth=3, alpha=0.9)
+    _HARTFORD_CITY_GDF.boundary.plot(ax=ax, color='black', linewidth=3, alpha=0.9)
     
     # Add Connecticut River indication (eastern boundary of Hartford city)
-    river_coords = [
-        (-72.6750, 41.7900), (-72.6700, 41.7850), (-72.6650, 41.7800), 
-        (-72.6680, 41.7750), (-72.6720, 41.7700), (-72.6750, 41.7650)
-    ]
-    
-    # Plot river line
-    river_x = [coord[0] for coord in river_coords]
-    river_y = [coord[1] for coord in river_coords]
-    ax.plot(river_x, river_y, color='#4A90E2', linewidth=4, alpha=0.8, label='Connecticut River')
+    ax.add_line(Line2D(_RIVER[:, 0], _RIVER[:, 1], color='#4A90E2', linewidth=4, alpha=0.8))
     
     # Customize map
     ax.set_title('Hartford City Only\nHeat Vulnerability Index - July 2024\n(Excluding West Hartford, East Hartford, Windsor, Wethersfield)', 
@@ -209,12 +248,12 @@ def create_hartford_only_map(hartford_gdf):
     
     # Create legend for vulnerability levels
     legend_elements = [
-        mpatches.Patch(color=colors[1], label='Level 1 - Lowest Risk'),
-        mpatches.Patch(color=colors[2], label='Level 2 - Low Risk'),
-        mpatches.Patch(color=colors[3], label='Level 3 - Moderate Risk'),
-        mpatches.Patch(color=colors[4], label='Level 4 - High Risk'),
-        mpatches.Patch(color=colors[5], label='Level 5 - Highest Risk'),
-        mpatches.Patch(color='#4A90E2', label='Connecticut River (Eastern Border)')
+        mpatches.Patch(color=_HARTFORD_PALETTE[1], label='Level 1 - Lowest Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[2], label='Level 2 - Low Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[3], label='Level 3 - Moderate Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[4], label='Level 4 - High Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[5], label='Level 5 - Highest Risk'),
+        Line2D([], [], color='#4A90E2', linewidth=4, label='Connecticut River (Eastern Border)')
     ]
     
     legend = ax.legend(
@@ -238,15 +277,21 @@ def create_hartford_only_map(hartford_gdf):
                 fontsize=16, fontweight='bold', ha='center')
     
     # Add statistics for Hartford city only
-    total_pop = hartford_gdf['population'].sum()
-    high_vuln_tracts = len(hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])])
-    high_vuln_pop = hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])]['population'].sum()
+    population = hartford_gdf['population'].to_numpy()
+    total_pop = int(population.sum())
+    n_tracts = len(hartford_gdf)
+    
+    # Levels 4-5 are high risk; build the mask once for both counts
+    high_mask = hartford_gdf['vulnerability_index'].to_numpy() >= 4
+    high_vuln_tracts = int(high_mask.sum())
+    high_vuln_tract_pct = high_vuln_tracts / n_tracts * 100 if n_tracts > 0 else 0
+    high_vuln_pop = int(population[high_mask].sum())
     high_vuln_pct = (high_vuln_pop / total_pop) * 100 if total_pop > 0 else 0
     
     stats_text = f"""Hartford City Statistics:
 • Total Population: {total_pop:,}
-• Census Tracts: {len(hartford_gdf)}
-• High Risk Tracts: {high_vuln_tracts} ({high_vuln_tracts/len(hartford_gdf)*100:.1f}%)
+• Census Tracts: {n_tracts}
+• High Risk Tracts: {high_vuln_tracts} ({high_vuln_tract_pct:.1f}%)
 • People at High Risk: {high_vuln_pop:,} ({high_vuln_pct:.1f}%)
 • City Area: ~17.4 sq miles
 • Capital of Connecticut"""
@@ -273,24 +318,28 @@ def create_hartford_only_map(hartford_gdf):
     ax.set_aspect('equal')
     plt.tight_layout()
     
-    # Save the map
+    # Save the map as vector PDF first (no rasterization needed)
+    pdf_path = 'hvi_output/hartford_city_only_vulnerability_map.pdf'
+    fig.savefig(pdf_path, bbox_inches='tight', facecolor='white')
+    print(f"✓ Saved PDF version to {pdf_path}")
+    
+    # Then rasterize once for the PNG
     output_path = 'hvi_output/hartford_city_only_vulnerability_map.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
+    fig.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
     print(f"✓ Saved Hartford city-only map to {output_path}")
     
-    # Also save as PDF
-    pdf_path = 'hvi_output/hartford_city_only_vulnerability_map.pdf'
-    plt.savefig(pdf_path, dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"✓ Saved PDF version to {pdf_path}")
+    if SHOW_PLOT:
+        plt.show()
     
-    plt.show()
+    # Release the figure now rather than at interpreter exit
+    plt.close(fig)
     
     # Print summary
     print(f"\n📊 Hartford City Heat Vulnerability Index Summary:")
     print(f"   • Map shows ONLY Hartford city proper")
     print(f"   • EXCLUDES neighboring towns (West Hartford, East Hartford, Windsor, Wethersfield)")
     print(f"   • Total population: {total_pop:,}")
-    print(f"   • {len(hartford_gdf)} census tracts with no overlapping regions")
+    print(f"   • {n_tracts} census tracts with no overlapping regions")
     print(f"   • Connecticut River forms eastern city boundary")
 
 if __name__ == "__main__":
@@ -3,15 +3,127 @@
 Create a simple map showing ONLY Hartford city proper
 """
 
-import pandas as pd
 import geopandas as gpd
+# The shared core picks the headless backend, so import it before pyplot
+from hartford_map_core import (
+    SHOW_PLOT, load_vulnerability_data, hartford_boundary, largest_parts, _HARTFORD_PALETTE
+)
 import matplotlib.pyplot as plt
 import numpy as np
-from shapely.geometry import Polygon, Point
+import shapely
 import matplotlib.patches as mpatches
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba_array
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Hartford city boundary (excluding neighboring towns). Every vertex bends the
+# outline by far more than 1e-4 degrees, so simplifying it removes nothing
+_HARTFORD_COORDS = (
+    (-72.715, 41.790),  # Northwest
+    (-72.695, 41.795),  # North
+    (-72.675, 41.790),  # Northeast
+    (-72.665, 41.785),  # East (Connecticut River)
+    (-72.660, 41.770),  # East-central (River)
+    (-72.665, 41.755),  # East-south (River)
+    (-72.675, 41.745),  # Southeast
+    (-72.695, 41.740),  # South
+    (-72.710, 41.745),  # Southwest
+    (-72.720, 41.760),  # West
+    (-72.715, 41.775),  # Northwest
+    (-72.715, 41.790)   # Close
+)
+
+# RGBA lookup indexed directly by vulnerability level; row 0 is a transparent sentinel
+_PALETTE_RGBA = np.vstack([
+    np.zeros(4),
+    to_rgba_array([_HARTFORD_PALETTE[level] for level in [1, 2, 3, 4, 5]])
+])
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _clip_ring_to_rect(ring, left, bottom, right, top):
+        """Sutherland-Hodgman clip of an open (N, 2) ring against one rectangle"""
+        out = ring
+        for side in range(4):
+            n = out.shape[0]
+            if n == 0:
+                break
+            clipped = np.empty((2 * n, 2))
+            m = 0
+            for i in range(n):
+                px, py = out[i - 1, 0], out[i - 1, 1]
+                cx, cy = out[i, 0], out[i, 1]
+                if side == 0:
+                    p_in, c_in = px >= left, cx >= left
+                elif side == 1:
+                    p_in, c_in = px <= right, cx <= right
+                elif side == 2:
+                    p_in, c_in = py >= bottom, cy >= bottom
+                else:
+                    p_in, c_in = py <= top, cy <= top
+                
+                # Emit the crossing point whenever the edge changes sides
+                if p_in != c_in:
+                    if side < 2:
+                        x = left if side == 0 else right
+                        clipped[m, 0] = x
+                        clipped[m, 1] = py + (x - px) * (cy - py) / (cx - px)
+                    else:
+                        y = bottom if side == 2 else top
+                        clipped[m, 0] = px + (y - py) * (cx - px) / (cy - py)
+                        clipped[m, 1] = y
+                    m += 1
+                if c_in:
+                    clipped[m, 0] = cx
+                    clipped[m, 1] = cy
+                    m += 1
+            out = clipped[:m]
+        return out
+    
+    @njit(cache=True)
+    def _clip_ring_to_rects(ring, rects):
+        """Clip an open ring against each (left, bottom, right, top) row; flat coords plus per-row counts"""
+        counts = np.zeros(rects.shape[0], dtype=np.int64)
+        coords = np.empty((rects.shape[0] * ring.shape[0], 2))
+        m = 0
+        for k in range(rects.shape[0]):
+            piece = _clip_ring_to_rect(ring, rects[k, 0], rects[k, 1], rects[k, 2], rects[k, 3])
+            if m + piece.shape[0] > coords.shape[0]:
+                grown = np.empty((2 * (m + piece.shape[0]), 2))
+                grown[:m] = coords[:m]
+                coords = grown
+            coords[m:m + piece.shape[0]] = piece
+            counts[k] = piece.shape[0]
+            m += piece.shape[0]
+        return coords[:m], counts
+
+def _rect_clip(cells, rects, city_boundary):
+    """Clip axis-aligned grid cells to the city boundary with the compiled kernel"""
+    ring = shapely.get_coordinates(shapely.get_exterior_ring(city_boundary))[:-1]
+    coords, counts = _clip_ring_to_rects(ring, rects)
+    
+    # Pieces with fewer than three vertices have no area
+    tracts = np.full(len(cells), shapely.Polygon(), dtype=object)
+    has_area = counts >= 3
+    owner = np.repeat(np.arange(len(cells)), counts)
+    keep = has_area[owner]
+    if has_area.any():
+        ring_index = (np.cumsum(has_area) - 1)[owner[keep]]
+        tracts[has_area] = shapely.polygons(shapely.linearrings(coords[keep], indices=ring_index))
+    
+    # Sutherland-Hodgman joins separate pieces of a concave boundary with
+    # zero-width edges; send those cells through the GEOS overlay instead
+    invalid = ~shapely.is_valid(tracts)
+    tracts[invalid] = shapely.intersection(cells[invalid], city_boundary)
+    return tracts
+
 def create_hartford_city_simple():
     """Create a simple map showing only Hartford city"""
     
@@ -19,7 +131,7 @@ def create_hartford_city_simple():
     
     # Load vulnerability data
     try:
-        hartford_data = pd.read_csv('hvi_output/hartford_vulnerability_data.csv')
+        hartford_data = load_vulnerability_data('hvi_output/hartford_vulnerability_data.csv')
         print(f"✓ Loaded vulnerability data: {len(hartford_data)} tracts")
     except FileNotFoundError:
         print("✗ Vulnerability data not found.")
@@ -31,8 +143,8 @@ def create_hartford_city_simple():
     # Create the map
     create_hartford_map(hartford_gdf)
 
-def create_hartford_city_simple_tracts(hartford_data):
-    """Create simple Hartford city with tracts"""
+def create_hartford_city_simple_tracts(hartford_data, grid_size=6):
+    """Create simple Hartford city with tracts on a grid_size x grid_size grid"""
     
     print("Creating Hartford city boundary and tracts...")
     
@@ -40,84 +152,72 @@ def create_hartford_city_simple_tracts(hartford_data):
     # Center: 41.7637°N, 72.6851°W
     center_lat, center_lon = 41.7637, -72.6851
     
-    # Hartford city boundary (excluding neighboring towns)
-    hartford_coords = [
-        (-72.715, 41.790),  # Northwest
-        (-72.695, 41.795),  # North
-        (-72.675, 41.790),  # Northeast
-        (-72.665, 41.785),  # East (Connecticut River)
-        (-72.660, 41.770),  # East-central (River)
-        (-72.665, 41.755),  # East-south (River)
-        (-72.675, 41.745),  # Southeast
-        (-72.695, 41.740),  # South
-        (-72.710, 41.745),  # Southwest
-        (-72.720, 41.760),  # West
-        (-72.715, 41.775),  # Northwest
-        (-72.715, 41.790)   # Close
-    ]
-    
-    hartford_boundary = Polygon(hartford_coords)
+    city_boundary = hartford_boundary(_HARTFORD_COORDS)
     
     # Create simple grid of tracts
-    bounds = hartford_boundary.bounds
+    bounds = city_boundary.bounds
     west, south, east, north = bounds
     
-    # Create a 6x6 grid (36 tracts)
-    grid_size = 6
+    # Create a 6x6 grid (36 tracts) by default
     cell_width = (east - west) / grid_size
     cell_height = (north - south) / grid_size
     
-    tract_polygons = []
-    tract_data = []
-    
-    tract_idx = 0
-    for row in range(grid_size):
-        for col in range(grid_size):
-            # Calculate cell boundaries
-            left = west + col * cell_width
-            right = west + (col + 1) * cell_width
-            bottom = south + row * cell_height
-            top = south + (row + 1) * cell_height
-            
-            # Create cell
-            cell = Polygon([
-                (left, bottom), (right, bottom),
-                (right, top), (left, top), (left, bottom)
-            ])
-            
-            # Intersect with Hartford boundary
-            tract = cell.intersection(hartford_boundary)
-            
-            # Keep if it has reasonable area
-            if hasattr(tract, 'area') and tract.area > 0.0005:
-                # Handle MultiPolygon
-                if hasattr(tract, 'geoms'):
-                    tract = max(tract.geoms, key=lambda x: x.area)
-                
-                tract_polygons.append(tract)
-                
-                # Use data from original dataset (cycling through)
-                data_idx = tract_idx % len(hartford_data)
-                tract_data.append(hartford_data.iloc[data_idx].copy())
-                tract_idx += 1
-    
-    # Create GeoDataFrame
-    if tract_data:
-        hartford_gdf = gpd.GeoDataFrame(
-            pd.DataFrame(tract_data),
-            geometry=tract_polygons,
-            crs='EPSG:4326'
-        )
+    # Calculate cell boundaries for every row and column at once
+    left = west + np.arange(grid_size) * cell_width
+    right = left + cell_width
+    bottom = south + np.arange(grid_size) * cell_height
+    top = bottom + cell_height
+    
+    # Closed ring coordinates for all cells, row by row, shape (grid_size ** 2, 5, 2)
+    ring_x = np.stack([left, right, right, left, left], axis=-1)
+    ring_y = np.stack([bottom, bottom, top, top, bottom], axis=-1)
+    coords = np.stack(
+        np.broadcast_arrays(ring_x[None, :, :], ring_y[:, None, :]), axis=-1
+    ).reshape(grid_size * grid_size, 5, 2)
+    
+    # Create all cells in a single call
+    cells = shapely.polygons(shapely.linearrings(coords))
+    
+    # Cells wholly inside the boundary are their own intersection, so only
+    # the cells straddling the boundary go through the overlay
+    shapely.prepare(city_boundary)
+    tracts = cells.copy()
+    edge = ~shapely.contains_properly(city_boundary, cells)
+    if HAS_NUMBA and grid_size * grid_size > 64:
+        # The compiled rectangle clip only pays for its warm-up on larger grids
+        rects = np.stack([coords[edge, 0, 0], coords[edge, 0, 1],
+                          coords[edge, 2, 0], coords[edge, 2, 1]], axis=-1)
+        tracts[edge] = _rect_clip(cells[edge], rects, city_boundary)
     else:
-        # Fallback if no tracts created
+        tracts[edge] = shapely.intersection(cells[edge], city_boundary)
+    
+    # Keep if valid and reasonable size (empty tracts have no area), then
+    # handle MultiPolygons
+    keep = (shapely.area(tracts) > 0.0005) & shapely.is_valid(tracts)
+    tract_polygons = list(largest_parts(tracts[keep]))
+    
+    # Fallback if no tracts created
+    if not tract_polygons:
         print("Creating fallback tracts...")
-        sample_data = hartford_data.iloc[:1].copy()
-        sample_polygon = hartford_boundary
-        hartford_gdf = gpd.GeoDataFrame(sample_data, geometry=[sample_polygon], crs='EPSG:4326')
+        tract_polygons = [city_boundary]
+    
+    # Create GeoDataFrame
+    hartford_gdf = assign_data_to_tracts(tract_polygons, hartford_data)
     
     print(f"✓ Created {len(hartford_gdf)} Hartford city tracts")
     return hartford_gdf
 
+def assign_data_to_tracts(tract_polygons, hartford_data):
+    """Pair data rows with tract polygons, cycling through the data"""
+    # Use data from original dataset, cycling through with a single row gather
+    data_idx = np.arange(len(tract_polygons)) % len(hartford_data)
+    
+    return gpd.GeoDataFrame(
+        hartford_data.take(data_idx).reset_index(drop=True),
+        geometry=list(tract_polygons),
+        crs='EPSG:4326'
+    )
+
 def create_hartford_map(hartford_gdf):
     """Create the Hartford city map"""
     
@@ -126,37 +226,29 @@ def create_hartford_map(hartford_gdf):
     # Create figure
     fig, ax = plt.subplots(1, 1, figsize=(12, 10))
     
-    # Define colors
-    colors = {
-        1: '#2E8B57',  # Dark green
-        2: '#90EE90',  # Light green
-        3: '#FFFF00',  # Yellow
-        4: '#FFA500',  # Orange
-        5: '#FF4500'   # Red-orange
-    }
-    
-    # Plot vulnerability levels
-    for level in [1, 2, 3, 4, 5]:
-        level_data = hartford_gdf[hartford_gdf['vulnerability_index'] == level]
-        if len(level_data) > 0:
-            level_data.plot(
-                ax=ax,
-                color=colors[level],
-                edgecolor='white',
-                linewidth=0.8,
-                alpha=0.85
-            )
+    # Look up every tract's color at once, lowest level drawn first
+    ordered = hartford_gdf.sort_values('vulnerability_index', kind='stable')
+    face_colors = _PALETTE_RGBA[ordered['vulnerability_index'].to_numpy()]
+    
+    # Plot vulnerability levels as one collection, rasterized even in the PDF
+    coords, owner = shapely.get_coordinates(
+        shapely.get_exterior_ring(ordered.geometry.to_numpy()), return_index=True)
+    # Views into one float64 buffer; matplotlib stores Path vertices as float64,
+    # so narrowing them to float32 here would only add a conversion copy
+    verts = np.split(coords, np.flatnonzero(np.diff(owner)) + 1)
+    ax.add_collection(PolyCollection(
+        verts,
+        facecolors=face_colors,
+        edgecolors='white',
+        linewidths=0.8,
+        alpha=0.85,
+        rasterized=True
+    ))
+    ax.autoscale_view()
     
     # Add Hartford city boundary
-    hartford_coords = [
-        (-72.715, 41.790), (-72.695, 41.795), (-72.675, 41.790), (-72.665, 41.785),
-        (-72.660, 41.770), (-72.665, 41.755), (-72.675, 41.745), (-72.695, 41.740),
-        (-72.710, 41.745), (-72.720, 41.760), (-72.715, 41.775), (-72.715, 41.790)
-    ]
-    
-    city_boundary = Polygon(hartford_coords)
-    city_gdf = gpd.GeoDataFrame([1], geometry=[city_boundary], crs='EPSG:4326')
-    city_gdf.boundary.plot(ax=ax, color='black', linewidth=3)
+    boundary_x, boundary_y = zip(*_HARTFORD_COORDS)
+    ax.plot(boundary_x, boundary_y, color='black', linewidth=3)
     
     # Add Connecticut River (eastern boundary)
     river_coords = [(-72.665, 41.785), (-72.660, 41.770), (-72.665, 41.755)]
@@ -174,11 +266,11 @@ def create_hartford_map(hartford_gdf):
     
     # Legend
     legend_elements = [
-        mpatches.Patch(color=colors[1], label='Level 1 - Lowest Risk'),
-        mpatches.Patch(color=colors[2], label='Level 2 - Low Risk'),
-        mpatches.Patch(color=colors[3], label='Level 3 - Moderate Risk'),
-        mpatches.Patch(color=colors[4], label='Level 4 - High Risk'),
-        mpatches.Patch(color=colors[5], label='Level 5 - Highest Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[1], label='Level 1 - Lowest Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[2], label='Level 2 - Low Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[3], label='Level 3 - Moderate Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[4], label='Level 4 - High Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[5], label='Level 5 - Highest Risk'),
         mpatches.Patch(color='#4A90E2', label='Connecticut River')
     ]
     
@@ -194,9 +286,13 @@ def create_hartford_map(hartford_gdf):
                 fontsize=16, fontweight='bold', ha='center')
     
     # Statistics
-    total_pop = hartford_gdf['population'].sum()
-    high_vuln_tracts = len(hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])])
-    high_vuln_pop = hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])]['population'].sum()
+    population = hartford_gdf['population'].to_numpy()
+    total_pop = int(population.sum())
+    
+    # Levels 4-5 are high risk; build the mask once for both counts
+    high_mask = hartford_gdf['vulnerability_index'].to_numpy() >= 4
+    high_vuln_tracts = int(high_mask.sum())
+    high_vuln_pop = int(population[high_mask].sum())
     high_vuln_pct = (high_vuln_pop / total_pop) * 100 if total_pop > 0 else 0
     
     stats_text = f"""Hartford City Only:
@@ -222,16 +318,23 @@ def create_hartford_map(hartford_gdf):
     ax.set_aspect('equal')
     plt.tight_layout()
     
+    # Measure the tight bounding box once and reuse it for both formats
+    bbox = fig.get_tightbbox().padded(plt.rcParams['savefig.pad_inches'])
+    
     # Save
     output_path = 'hvi_output/hartford_city_only_map.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
+    fig.savefig(output_path, dpi=150, bbox_inches=bbox, facecolor='white')
     print(f"✓ Saved Hartford city-only map to {output_path}")
     
     pdf_path = 'hvi_output/hartford_city_only_map.pdf'
-    plt.savefig(pdf_path, dpi=300, bbox_inches='tight', facecolor='white')
+    fig.savefig(pdf_path, dpi=150, bbox_inches=bbox, facecolor='white')
     print(f"✓ Saved PDF to {pdf_path}")
     
-    plt.show()
+    if SHOW_PLOT:
+        plt.show()
+    
+    # Release the figure now rather than at interpreter exit
+    plt.close(fig)
     
     print(f"\n📊 Hartford City Summary:")
     print(f"   • Shows ONLY Hartford city proper")
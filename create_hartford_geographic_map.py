@@ -3,65 +3,87 @@
 Create a proper Hartford Heat Vulnerability Index map with realistic boundaries and no overlaps
 """
 
-import pandas as pd
 import geopandas as gpd
+# The shared core picks the headless backend, so import it before pyplot
+from hartford_map_core import (
+    SHOW_PLOT, load_vulnerability_data, hartford_boundary, largest_parts, _HARTFORD_PALETTE
+)
 import matplotlib.pyplot as plt
 import numpy as np
-from shapely.geometry import Polygon, Point
+import shapely
 from shapely.ops import unary_union
 import matplotlib.patches as mpatches
-from scipy.spatial import Voronoi
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba_array
+from scipy.spatial import Voronoi, cKDTree
+from itertools import chain
 import warnings
 warnings.filterwarnings('ignore')
 
-def create_hartford_geographic_map():
+# Hartford real coordinates (approximate city boundary)
+_HARTFORD_COORDS = (
+    (-72.7200, 41.7200),  # Southwest
+    (-72.7200, 41.7900),  # Northwest
+    (-72.6500, 41.7900),  # Northeast
+    (-72.6500, 41.7600),  # East center
+    (-72.6300, 41.7400),  # Southeast point
+    (-72.6600, 41.7200),  # South center
+    (-72.7200, 41.7200)   # Close polygon
+)
+
+# RGBA lookup indexed directly by vulnerability level; row 0 is a transparent sentinel
+_PALETTE_RGBA = np.vstack([
+    np.zeros(4),
+    to_rgba_array([_HARTFORD_PALETTE[level] for level in [1, 2, 3, 4, 5]])
+])
+
+def create_hartford_geographic_map(backend='voronoi'):
     """Create a proper Hartford map with realistic boundaries"""
     
     print("Creating Hartford Heat Vulnerability Index map with proper boundaries...")
     
     # Load the vulnerability data
     try:
-        hartford_data = pd.read_csv('hvi_output/hartford_vulnerability_data.csv')
+        hartford_data = load_vulnerability_data('hvi_output/hartford_vulnerability_data.csv')
         print(f"✓ Loaded vulnerability data: {len(hartford_data)} tracts")
     except FileNotFoundError:
         print("✗ Vulnerability data not found. Run hartford_hvi_implementation.py first.")
         return
     
     # Create Hartford city boundary and census tracts
-    hartford_gdf = create_hartford_boundary_with_tracts(hartford_data)
+    hartford_gdf = create_hartford_boundary_with_tracts(hartford_data, backend)
     
     # Create the final map
-    create_professional_hartford_map(hartford_gdf)
+    create_professional_hartford_map(hartford_gdf, backend)
 
-def create_hartford_boundary_with_tracts(hartford_data):
+def create_hartford_boundary_with_tracts(hartford_data, backend='voronoi'):
     """Create realistic Hartford city boundary with non-overlapping census tracts"""
     
-    print("Creating Hartford city boundary with census tracts...")
+    if backend not in ('voronoi', 'raster'):
+        raise ValueError(f"Unknown backend: {backend}")
     
-    # Hartford real coordinates (approximate city boundary)
-    hartford_boundary_coords = [
-        (-72.7200, 41.7200),  # Southwest
-        (-72.7200, 41.7900),  # Northwest  
-        (-72.6500, 41.7900),  # Northeast
-        (-72.6500, 41.7600),  # East center
-        (-72.6300, 41.7400),  # Southeast point
-        (-72.6600, 41.7200),  # South center
-        (-72.7200, 41.7200)   # Close polygon
-    ]
+    print("Creating Hartford city boundary with census tracts...")
     
     # Create Hartford city boundary
-    hartford_boundary = Polygon(hartford_boundary_coords)
+    city_boundary = hartford_boundary(_HARTFORD_COORDS)
+    
+    # Prepare it once so every containment test below reuses the indexed boundary
+    shapely.prepare(city_boundary)
     
     # Create census tract centers using population-based clustering
-    tract_centers = generate_tract_centers(hartford_data, hartford_boundary)
+    tract_centers = generate_tract_centers(hartford_data, city_boundary)
     
-    # Create Voronoi diagram for non-overlapping tracts
-    tract_polygons = create_voronoi_tracts(tract_centers, hartford_boundary)
+    if backend == 'raster':
+        # Tracts stay as their center points and are rasterized when drawn
+        tract_geometry = shapely.points(tract_centers)
+    else:
+        # Create Voronoi diagram for non-overlapping tracts
+        tract_geometry = create_voronoi_tracts(tract_centers, city_boundary)
     
     # Create GeoDataFrame
     hartford_gdf = gpd.GeoDataFrame(
         hartford_data, 
-        geometry=tract_polygons, 
+        geometry=tract_geometry, 
         crs='EPSG:4326'
     )
     
@@ -86,56 +108,41 @@ def generate_tract_centers(hartford_data, city_boundary):
         {"name": "Behind the Rocks", "center": (-72.6750, 41.7520), "weight": 1.4},
     ]
     
-    tract_centers = []
-    np.random.seed(42)  # For reproducible results
+    centers = np.array([n["center"] for n in neighborhoods])
+    weights = np.array([n["weight"] for n in neighborhoods])
+    rng = np.random.default_rng(42)  # For reproducible results
     
     # Sort tracts by population for better placement
-    sorted_data = hartford_data.sort_values('population', ascending=False)
+    population = hartford_data['population'].to_numpy()
+    population_weight = np.sort(population)[::-1] / population.max()
+    
+    # Choose neighborhood based on population (higher pop = more likely downtown):
+    # downtown only, the first 3, the first 5, or any neighborhood
+    n_choices = np.select(
+        [population_weight > 0.8, population_weight > 0.6, population_weight > 0.4],
+        [1, 3, 5],
+        len(neighborhoods)
+    )
+    neighborhood = rng.integers(0, n_choices)
     
-    for i, (_, row) in enumerate(sorted_data.iterrows()):
-        population_weight = row['population'] / hartford_data['population'].max()
-        
-        # Choose neighborhood based on population (higher pop = more likely downtown)
-        if population_weight > 0.8:
-            # High population - downtown area
-            neighborhood = neighborhoods[0]  # Downtown
-        elif population_weight > 0.6:
-            # Medium-high population
-            neighborhood = np.random.choice(neighborhoods[:3])
-        elif population_weight > 0.4:
-            # Medium population
-            neighborhood = np.random.choice(neighborhoods[:5])
-        else:
-            # Lower population - any neighborhood
-            neighborhood = np.random.choice(neighborhoods)
-        
-        # Add some randomness around neighborhood center
-        center_lon, center_lat = neighborhood["center"]
-        
-        # Spread based on neighborhood weight and population
-        spread = 0.008 / neighborhood["weight"] * (0.5 + population_weight)
-        
-        # Generate point within neighborhood
-        attempts = 0
-        while attempts < 50:  # Prevent infinite loop
-            offset_lat = np.random.normal(0, spread)
-            offset_lon = np.random.normal(0, spread)
-            
-            point_lat = center_lat + offset_lat
-            point_lon = center_lon + offset_lon
-            
-            test_point = Point(point_lon, point_lat)
-            
-            # Check if point is within city boundary
-            if city_boundary.contains(test_point):
-                tract_centers.append((point_lon, point_lat))
-                break
-            
-            attempts += 1
-        
-        # Fallback if we can't find a good point
-        if attempts >= 50:
-            tract_centers.append(neighborhood["center"])
+    # Spread based on neighborhood weight and population
+    spread = 0.008 / weights[neighborhood] * (0.5 + population_weight)
+    
+    # Draw up to 50 candidate points around each neighborhood center at once
+    max_attempts = 50
+    candidates = (centers[neighborhood][:, None, :]
+                  + rng.normal(size=(len(neighborhood), max_attempts, 2)) * spread[:, None, None])
+    
+    # Check which candidates are within city boundary in a single call
+    inside = shapely.contains(
+        city_boundary, shapely.points(candidates.reshape(-1, 2))
+    ).reshape(len(neighborhood), max_attempts)
+    
+    # Keep the first point inside the city, falling back to the neighborhood center
+    first = inside.argmax(axis=1)
+    tract_centers = candidates[np.arange(len(neighborhood)), first]
+    missed = ~inside.any(axis=1)
+    tract_centers[missed] = centers[neighborhood[missed]]
     
     print(f"✓ Generated {len(tract_centers)} tract centers")
     return tract_centers
@@ -146,88 +153,113 @@ def create_voronoi_tracts(tract_centers, city_boundary):
     print("Creating Voronoi tessellation for census tracts...")
     
     # Convert to numpy array for Voronoi
-    points = np.array(tract_centers)
+    points = np.asarray(tract_centers)
     
     # Create Voronoi diagram
     vor = Voronoi(points)
     
-    tract_polygons = []
+    # Flatten the ragged Voronoi cell of every point into one vertex index array
+    regions = [vor.regions[region_index] for region_index in vor.point_region]
+    sizes = np.fromiter(map(len, regions), dtype=np.intp, count=len(regions))
+    vertex_index = np.fromiter(chain.from_iterable(regions), dtype=np.intp, count=sizes.sum())
+    owner = np.repeat(np.arange(len(regions)), sizes)
     
-    for i, point in enumerate(points):
-        # Find the Voronoi cell for this point
-        region_index = vor.point_region[i]
-        region = vor.regions[region_index]
-        
-        if not region or -1 in region:
-            # Handle edge cases - create a small polygon around the point
-            buffer_size = 0.003
-            tract_polygon = Point(point).buffer(buffer_size)
-        else:
-            # Create polygon from Voronoi vertices
-            vertices = [vor.vertices[j] for j in region]
-            try:
-                tract_polygon = Polygon(vertices)
-            except:
-                # Fallback for invalid polygons
-                buffer_size = 0.003
-                tract_polygon = Point(point).buffer(buffer_size)
-        
-        # Clip to city boundary
-        tract_polygon = tract_polygon.intersection(city_boundary)
-        
-        # Ensure we have a valid polygon
-        if tract_polygon.is_empty or not tract_polygon.is_valid:
-            buffer_size = 0.002
-            tract_polygon = Point(point).buffer(buffer_size).intersection(city_boundary)
-        
-        # Handle MultiPolygon case - take the largest part
-        if hasattr(tract_polygon, 'geoms'):
-            tract_polygon = max(tract_polygon.geoms, key=lambda p: p.area)
-        
-        tract_polygons.append(tract_polygon)
+    # Open cells reference the vertex at infinity (-1) and empty cells have no
+    # vertices; both are edge cases
+    finite = sizes > 0
+    finite[owner[vertex_index < 0]] = False
+    
+    tract_polygons = np.empty(len(points), dtype=object)
+    
+    if finite.any():
+        # Create polygons from Voronoi vertices for every closed cell in one call
+        closed = finite[owner]
+        ring_index = (np.cumsum(finite) - 1)[owner[closed]]
+        rings = shapely.linearrings(vor.vertices[vertex_index[closed]], indices=ring_index)
+        tract_polygons[finite] = shapely.polygons(rings)
+    
+    # Handle edge cases - create a small polygon around the point
+    tract_polygons[~finite] = shapely.buffer(shapely.points(points[~finite]), 0.003, quad_segs=16)
+    
+    # Clip to city boundary
+    tract_polygons = shapely.intersection(tract_polygons, city_boundary)
+    
+    # Ensure we have a valid polygon
+    invalid = shapely.is_empty(tract_polygons) | ~shapely.is_valid(tract_polygons)
+    tract_polygons[invalid] = shapely.intersection(
+        shapely.buffer(shapely.points(points[invalid]), 0.002, quad_segs=16), city_boundary)
+    
+    # Handle MultiPolygon case - take the largest part
+    tract_polygons = list(largest_parts(tract_polygons))
     
     print(f"✓ Created {len(tract_polygons)} non-overlapping tract polygons")
     return tract_polygons
 
-def create_professional_hartford_map(hartford_gdf):
+def _raster_tracts(ax, hartford_gdf, resolution=512):
+    """Color every pixel inside the city by the level of its nearest tract center"""
+    city_boundary = hartford_boundary(_HARTFORD_COORDS)
+    west, south, east, north = city_boundary.bounds
+    
+    # Pixel centers of a resolution x resolution raster over the city bounds
+    xs, ys = np.meshgrid(
+        west + (np.arange(resolution) + 0.5) * (east - west) / resolution,
+        south + (np.arange(resolution) + 0.5) * (north - south) / resolution
+    )
+    xs, ys = xs.ravel(), ys.ravel()
+    
+    # Nearest tract center for every pixel in one k-d tree query
+    tree = cKDTree(shapely.get_coordinates(hartford_gdf.geometry.to_numpy()))
+    _, owner = tree.query(np.column_stack([xs, ys]))
+    rgba = _PALETTE_RGBA[hartford_gdf['vulnerability_index'].to_numpy()[owner]]
+    
+    # Pixels outside the city take the transparent sentinel row
+    rgba[~shapely.contains_xy(city_boundary, xs, ys)] = _PALETTE_RGBA[0]
+    ax.imshow(
+        rgba.reshape(resolution, resolution, 4),
+        origin='lower',
+        extent=(west, east, south, north),
+        interpolation='nearest',
+        alpha=0.85
+    )
+
+def create_professional_hartford_map(hartford_gdf, backend='voronoi'):
     """Create the final professional Hartford map"""
     
+    if backend not in ('voronoi', 'raster'):
+        raise ValueError(f"Unknown backend: {backend}")
+    
     print("Creating professional Hartford Heat Vulnerability Index map...")
     
     # Create figure
     fig, ax = plt.subplots(1, 1, figsize=(14, 10))
     
-    # Define vulnerability level colors
-    colors = {
-        1: '#2E8B57',  # Dark green (lowest risk)
-        2: '#90EE90',  # Light green (low risk) 
-        3: '#FFFF00',  # Yellow (moderate risk)
-        4: '#FFA500',  # Orange (high risk)
-        5: '#FF4500'   # Red-orange (highest risk)
-    }
-    
-    # Plot each vulnerability level
-    for level in [1, 2, 3, 4, 5]:
-        level_data = hartford_gdf[hartford_gdf['vulnerability_index'] == level]
-        if len(level_data) > 0:
-            level_data.plot(
-                ax=ax,
-                color=colors[level],
-                edgecolor='white',
-                linewidth=0.8,
-                alpha=0.85,
-                label=f'Level {level}'
-            )
+    if backend == 'raster':
+        # Nearest-center raster: one image instead of clipped Voronoi polygons
+        _raster_tracts(ax, hartford_gdf)
+    else:
+        # Look up every tract's color at once, lowest level drawn first
+        ordered = hartford_gdf.sort_values('vulnerability_index', kind='stable')
+        face_colors = _PALETTE_RGBA[ordered['vulnerability_index'].to_numpy()]
+        
+        # Plot every vulnerability level as one collection, rasterized even in the PDF
+        coords, owner = shapely.get_coordinates(
+            shapely.get_exterior_ring(ordered.geometry.to_numpy()), return_index=True)
+        # Views into one float64 buffer; matplotlib stores Path vertices as float64,
+        # so narrowing them to float32 here would only add a conversion copy
+        verts = np.split(coords, np.flatnonzero(np.diff(owner)) + 1)
+        ax.add_collection(PolyCollection(
+            verts,
+            facecolors=face_colors,
+            edgecolors='white',
+            linewidths=0.8,
+            alpha=0.85,
+            rasterized=True
+        ))
+        ax.autoscale_view()
     
     # Add Hartford city boundary outline
-    city_boundary_coords = [
-        (-72.7200, 41.7200), (-72.7200, 41.7900), (-72.6500, 41.7900),
-        (-72.6500, 41.7600), (-72.6300, 41.7400), (-72.6600, 41.7200),
-        (-72.7200, 41.7200)
-    ]
-    city_boundary = Polygon(city_boundary_coords)
-    city_gdf = gpd.GeoDataFrame([1], geometry=[city_boundary], crs='EPSG:4326')
-    city_gdf.boundary.plot(ax=ax, color='black', linewidth=3, alpha=0.8)
+    boundary_x, boundary_y = zip(*_HARTFORD_COORDS)
+    ax.plot(boundary_x, boundary_y, color='black', linewidth=3, alpha=0.8)
     
     # Customize the map
     ax.set_title('Hartford, Connecticut\nHeat Vulnerability Index - July 2024', 
@@ -244,11 +276,11 @@ def create_professional_hartford_map(hartford_gdf):
     
     # Create custom legend
     legend_elements = [
-        mpatches.Patch(color=colors[1], label='Level 1 - Lowest Risk'),
-        mpatches.Patch(color=colors[2], label='Level 2 - Low Risk'),
-        mpatches.Patch(color=colors[3], label='Level 3 - Moderate Risk'),
-        mpatches.Patch(color=colors[4], label='Level 4 - High Risk'),
-        mpatches.Patch(color=colors[5], label='Level 5 - Highest Risk')
+        mpatches.Patch(color=_HARTFORD_PALETTE[1], label='Level 1 - Lowest Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[2], label='Level 2 - Low Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[3], label='Level 3 - Moderate Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[4], label='Level 4 - High Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[5], label='Level 5 - Highest Risk')
     ]
     
     legend = ax.legend(
@@ -273,9 +305,13 @@ def create_professional_hartford_map(hartford_gdf):
                 fontsize=16, fontweight='bold', ha='center')
     
     # Add key statistics box
-    total_pop = hartford_gdf['population'].sum()
-    high_vuln_tracts = len(hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])])
-    high_vuln_pop = hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])]['population'].sum()
+    population = hartford_gdf['population'].to_numpy()
+    total_pop = int(population.sum())
+    
+    # Levels 4-5 are high risk; build the mask once for both counts
+    high_mask = hartford_gdf['vulnerability_index'].to_numpy() >= 4
+    high_vuln_tracts = int(high_mask.sum())
+    high_vuln_pop = int(population[high_mask].sum())
     high_vuln_pct = (high_vuln_pop / total_pop) * 100
     avg_temp = hartford_gdf['mean_temp'].mean()
     
@@ -307,17 +343,24 @@ def create_professional_hartford_map(hartford_gdf):
     ax.set_aspect('equal')
     plt.tight_layout()
     
+    # Measure the tight bounding box once and reuse it for both formats
+    bbox = fig.get_tightbbox().padded(plt.rcParams['savefig.pad_inches'])
+    
     # Save the map
     output_path = 'hvi_output/hartford_heat_vulnerability_geographic_map.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
+    fig.savefig(output_path, dpi=150, bbox_inches=bbox, facecolor='white')
     print(f"✓ Saved Hartford geographic map to {output_path}")
     
     # Also save as PDF
     pdf_path = 'hvi_output/hartford_heat_vulnerability_geographic_map.pdf'
-    plt.savefig(pdf_path, dpi=300, bbox_inches='tight', facecolor='white')
+    fig.savefig(pdf_path, dpi=150, bbox_inches=bbox, facecolor='white')
     print(f"✓ Saved PDF version to {pdf_path}")
     
-    plt.show()
+    if SHOW_PLOT:
+        plt.show()
+    
+    # Release the figure now rather than at interpreter exit
+    plt.close(fig)
     
     # Print summary
     print(f"\n📊 Hartford Heat Vulnerability Index Summary:")
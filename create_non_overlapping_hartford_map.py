@@ -8,13 +8,47 @@ import pandas as pd
 import geopandas as gpd
 import folium
 from folium import plugins
+import gzip
+import json
+import re
+import shutil
 import numpy as np
-from shapely.geometry import Point, Polygon, MultiPolygon
+import shapely
+from shapely.geometry import Polygon
 from shapely.ops import voronoi_diagram
-from shapely.geometry.collection import GeometryCollection
+from hartford_map_core import largest_parts
 import warnings
 warnings.filterwarnings('ignore')
 
+# Exact same color scheme as original, indexed directly by vulnerability level;
+# index 0 is the gray used for missing data
+_LEVEL_COLORS = (
+    '#808080',  # Gray (missing data)
+    '#2E8B57',  # Dark green (lowest risk)
+    '#90EE90',  # Light green (low risk)
+    '#FFFF00',  # Yellow (moderate risk)
+    '#FFA500',  # Orange (high risk)
+    '#FF4500'   # Red-orange (highest risk)
+)
+
+# Tract popup, filled in once per tract with str.format; the indentation
+# between tags is stripped once here so it is not repeated per tract
+_POPUP_TEMPLATE = re.sub(r'>\s+<', '><', """
+        <div style="width: 300px;">
+            <h4 style="margin-bottom: 10px; color: #333;">Census Tract {tract}</h4>
+            <hr style="margin: 5px 0;">
+            <table style="width: 100%; font-size: 12px;">
+                <tr><td><b>Vulnerability Level:</b></td><td style="color: {color}; font-weight: bold;">Level {level}</td></tr>
+                <tr><td><b>Population:</b></td><td>{population:,}</td></tr>
+                <tr><td><b>Median Income:</b></td><td>${median_income:,}</td></tr>
+                <tr><td><b>Temperature:</b></td><td>{mean_temp:.1f}°C</td></tr>
+                <tr><td><b>AC Access:</b></td><td>{ac_probability:.1%}</td></tr>
+                <tr><td><b>Green Space:</b></td><td>{green_space_pct:.1%}</td></tr>
+                <tr><td><b>Vulnerability Score:</b></td><td>{vulnerability_score:.3f}</td></tr>
+            </table>
+        </div>
+        """).strip()
+
 def create_non_overlapping_hartford_map():
     """Create Hartford Heat Vulnerability Index map with guaranteed non-overlapping regions"""
     
@@ -63,10 +97,12 @@ def create_voronoi_tracts(hartford_data):
     np.random.seed(42)  # For reproducible results
     
     # Use population density and vulnerability to influence placement
-    population_weights = hartford_data['population'] / hartford_data['population'].max()
-    vulnerability_weights = hartford_data['vulnerability_index'] / 5.0
+    population_weights = (hartford_data['population'] / hartford_data['population'].max()).to_numpy()
+    vulnerability_weights = (hartford_data['vulnerability_index'] / 5.0).to_numpy()
     
-    points = []
+    # Seed coordinates are filled in place, one array per axis
+    lons = np.empty(len(hartford_data))
+    lats = np.empty(len(hartford_data))
     
     # Define cluster centers based on Hartford geography
     cluster_centers = [
@@ -79,9 +115,9 @@ def create_voronoi_tracts(hartford_data):
         (hartford_center_lat - 0.01, hartford_center_lon - 0.04),     # Newington area
     ]
     
-    for i, (_, row) in enumerate(hartford_data.iterrows()):
-        pop_weight = population_weights.iloc[i]
-        vuln_weight = vulnerability_weights.iloc[i]
+    for i in range(len(hartford_data)):
+        pop_weight = population_weights[i]
+        vuln_weight = vulnerability_weights[i]
         
         # Higher population and vulnerability = closer to downtown
         if pop_weight > 0.7 or vuln_weight > 0.6:
@@ -101,46 +137,43 @@ def create_voronoi_tracts(hartford_data):
         lon = center_lon + np.random.normal(0, spread)
         
         # Ensure points stay within bounds
-        lat = max(south + 0.01, min(north - 0.01, lat))
-        lon = max(west + 0.01, min(east - 0.01, lon))
-        
-        points.append(Point(lon, lat))
+        lats[i] = max(south + 0.01, min(north - 0.01, lat))
+        lons[i] = max(west + 0.01, min(east - 0.01, lon))
+    
+    points = shapely.points(lons, lats)
     
     # Create Voronoi diagram
-    multipoint = MultiPolygon([point.buffer(0.001) for point in points])
+    multipoint = shapely.multipolygons(shapely.buffer(points, 0.001, quad_segs=16))
     voronoi_polys = voronoi_diagram(multipoint, envelope=boundary)
     
-    # Extract individual polygons and ensure they're properly formed
-    geometries = []
-    if isinstance(voronoi_polys, GeometryCollection):
-        for geom in voronoi_polys.geoms:
-            if isinstance(geom, Polygon) and geom.is_valid:
-                # Clip to boundary and ensure reasonable size
-                clipped = geom.intersection(boundary)
-                if isinstance(clipped, Polygon) and clipped.area > 0.0001:
-                    geometries.append(clipped)
-                elif isinstance(clipped, MultiPolygon):
-                    # Take the largest polygon if we get multiple parts
-                    largest = max(clipped.geoms, key=lambda x: x.area)
-                    if largest.area > 0.0001:
-                        geometries.append(largest)
-    
-    # If we don't have enough geometries, create fallback regular polygons
-    while len(geometries) < len(hartford_data):
-        # Create a fallback polygon around remaining points
-        point_idx = len(geometries)
-        if point_idx < len(points):
-            center = points[point_idx]
-            size = 0.008
-            # Create a hexagon around the point
-            angles = np.linspace(0, 2*np.pi, 7)
-            vertices = [(center.x + size * np.cos(a), center.y + size * np.sin(a)) for a in angles]
-            poly = Polygon(vertices)
-            if poly.is_valid:
-                geometries.append(poly)
-    
-    # Trim to exact number needed
-    geometries = geometries[:len(hartford_data)]
+    # Keep the valid polygon cells, in diagram order
+    cells = shapely.get_parts(voronoi_polys)
+    cells = cells[(shapely.get_type_id(cells) == 3) & shapely.is_valid(cells)]
+    
+    # Only cells reaching the boundary need clipping; interior cells are kept as-is.
+    # The boundary is an axis-aligned box, so GEOS's rectangle clipper replaces overlay
+    shapely.prepare(boundary)
+    edge = ~shapely.contains_properly(boundary, cells)
+    clipped = cells.copy()
+    clipped[edge] = shapely.clip_by_rect(cells[edge], west, south, east, north)
+    
+    # Only polygon and multipolygon results are kept; take the largest part of the latter
+    type_id = shapely.get_type_id(clipped)
+    clipped = largest_parts(clipped[(type_id == 3) | (type_id == 6)])
+    
+    # Ensure reasonable size, trimmed to the exact number needed
+    clipped = clipped[shapely.area(clipped) > 0.0001][:len(hartford_data)]
+    geometries = np.empty(len(hartford_data), dtype=object)
+    geometries[:len(clipped)] = clipped
+    
+    # If we don't have enough geometries, create fallback hexagons around the remaining points
+    point_idx = np.arange(len(clipped), len(hartford_data))
+    size = 0.008
+    angles = np.linspace(0, 2*np.pi, 7)
+    geometries[point_idx] = shapely.polygons(np.stack([
+        lons[point_idx, None] + size * np.cos(angles),
+        lats[point_idx, None] + size * np.sin(angles)
+    ], axis=-1))
     
     # Create GeoDataFrame
     hartford_gdf = gpd.GeoDataFrame(hartford_data, geometry=geometries, crs='EPSG:4326')
@@ -148,6 +181,16 @@ def create_voronoi_tracts(hartford_data):
     print(f"✓ Created {len(hartford_gdf)} non-overlapping tract boundaries")
     return hartford_gdf
 
+def _tract_style(feature):
+    """Style a tract from the fill color carried in its properties"""
+    return {
+        'fillColor': feature['properties']['fillColor'],
+        'color': 'white',
+        'weight': 1,
+        'fillOpacity': 0.8,
+        'opacity': 0.8
+    }
+
 def create_interactive_vulnerability_map(hartford_gdf):
     """Create the interactive vulnerability map using Folium - matches original exactly"""
     
@@ -156,11 +199,14 @@ def create_interactive_vulnerability_map(hartford_gdf):
     center_lat = (bounds[1] + bounds[3]) / 2
     center_lon = (bounds[0] + bounds[2]) / 2
     
-    # Create base map with exact same settings as original
+    # Create base map with exact same settings as original; tracts are drawn on a
+    # canvas rather than as one SVG path each, which keeps pan and zoom smooth at the
+    # cost of Leaflet hit-testing hover and click on the canvas instead of the DOM
     m = folium.Map(
         location=[center_lat, center_lon],
         zoom_start=12,
-        tiles=None
+        tiles=None,
+        prefer_canvas=True
     )
     
     # Add the exact same tile layers as the original
@@ -187,51 +233,51 @@ def create_interactive_vulnerability_map(hartford_gdf):
         control=True
     ).add_to(m)
     
-    # Define exact same color scheme as original
-    def get_color(vulnerability_level):
-        colors = {
-            1: '#2E8B57',  # Dark green (lowest risk)
-            2: '#90EE90',  # Light green (low risk) 
-            3: '#FFFF00',  # Yellow (moderate risk)
-            4: '#FFA500',  # Orange (high risk)
-            5: '#FF4500'   # Red-orange (highest risk)
-        }
-        return colors.get(vulnerability_level, '#808080')
-    
-    # Add vulnerability data to map with exact same styling
-    for idx, row in hartford_gdf.iterrows():
+    # Serialize every tract geometry to GeoJSON up front in one call, rounded to
+    # 6 decimal places (about 0.1 m); pointwise mode leaves the topology alone
+    tract_geojson = shapely.to_geojson(
+        shapely.set_precision(hartford_gdf.geometry.to_numpy(), 1e-6, mode='pointwise'))
+    
+    # Collect the tracts of each vulnerability level into one feature collection
+    level_features = {}
+    for row, geojson in zip(hartford_gdf.itertuples(index=False), tract_geojson):
+        fill_color = _LEVEL_COLORS[row.vulnerability_index]
+        
         # Create popup content exactly like original
-        popup_content = f"""
-        <div style="width: 300px;">
-            <h4 style="margin-bottom: 10px; color: #333;">Census Tract {row['tract']}</h4>
-            <hr style="margin: 5px 0;">
-            <table style="width: 100%; font-size: 12px;">
-                <tr><td><b>Vulnerability Level:</b></td><td style="color: {get_color(row['vulnerability_index'])}; font-weight: bold;">Level {row['vulnerability_index']}</td></tr>
-                <tr><td><b>Population:</b></td><td>{row['population']:,}</td></tr>
-                <tr><td><b>Median Income:</b></td><td>${row['median_income']:,}</td></tr>
-                <tr><td><b>Temperature:</b></td><td>{row['mean_temp']:.1f}°C</td></tr>
-                <tr><td><b>AC Access:</b></td><td>{row['ac_probability']:.1%}</td></tr>
-                <tr><td><b>Green Space:</b></td><td>{row['green_space_pct']:.1%}</td></tr>
-                <tr><td><b>Vulnerability Score:</b></td><td>{row['vulnerability_score']:.3f}</td></tr>
-            </table>
-        </div>
-        """
+        popup_content = _POPUP_TEMPLATE.format(
+            tract=row.tract,
+            color=fill_color,
+            level=row.vulnerability_index,
+            population=row.population,
+            median_income=row.median_income,
+            mean_temp=row.mean_temp,
+            ac_probability=row.ac_probability,
+            green_space_pct=row.green_space_pct,
+            vulnerability_score=row.vulnerability_score
+        )
         
         # Create tooltip exactly like original
-        tooltip_content = f"Tract {row['tract']}: Level {row['vulnerability_index']} Risk"
+        tooltip_content = f"Tract {row.tract}: Level {row.vulnerability_index} Risk"
         
-        # Add tract to map with exact same styling as original
+        # Fill color, popup and tooltip travel with the tract as feature properties
+        level_features.setdefault(row.vulnerability_index, []).append({
+            'type': 'Feature',
+            'geometry': json.loads(geojson),
+            'properties': {
+                'fillColor': fill_color,
+                'popup': popup_content,
+                'tooltip': tooltip_content
+            }
+        })
+    
+    # Add one layer per vulnerability level with exact same styling as original
+    for level, features in sorted(level_features.items()):
         folium.GeoJson(
-            row.geometry.__geo_interface__,
-            style_function=lambda x, color=get_color(row['vulnerability_index']): {
-                'fillColor': color,
-                'color': 'white',
-                'weight': 1,
-                'fillOpacity': 0.8,
-                'opacity': 0.8
-            },
-            popup=folium.Popup(popup_content, max_width=400),
-            tooltip=tooltip_content
+            {'type': 'FeatureCollection', 'features': features},
+            name=f'Level {level}',
+            style_function=_tract_style,
+            popup=folium.GeoJsonPopup(fields=['popup'], labels=False, localize=False, max_width=400),
+            tooltip=folium.GeoJsonTooltip(fields=['tooltip'], labels=False)
         ).add_to(m)
     
     # Add exact same title as original
@@ -299,6 +345,11 @@ def create_interactive_vulnerability_map(hartford_gdf):
     m.save(map_path)
     print(f"✓ Saved non-overlapping interactive map to {map_path}")
     
+    # Precompressed copy for servers that serve .gz files directly; mtime=0 keeps it reproducible
+    with open(map_path, 'rb') as src, gzip.GzipFile(map_path + '.gz', 'wb', compresslevel=6, mtime=0) as dst:
+        shutil.copyfileobj(src, dst)
+    print(f"✓ Saved compressed copy to {map_path}.gz")
+    
     return m
 
 if __name__ == "__main__":
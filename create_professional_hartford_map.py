@@ -8,10 +8,9 @@ import geopandas as gpd
 import folium
 from folium import plugins
 import json
+import re
 import numpy as np
-from shapely.geometry import Polygon
-import math
-import random
+import shapely
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -36,9 +35,6 @@ def create_professional_hartford_map():
 
 def create_realistic_hartford_tracts(hartford_data):
     """Create realistic census tract geometries for Hartford"""
-    from shapely.geometry import Polygon
-    from shapely.ops import voronoi_diagram
-    from shapely.geometry import Point, MultiPoint
     
     print("Creating realistic Hartford census tract boundaries...")
     
@@ -56,87 +52,63 @@ def create_realistic_hartford_tracts(hartford_data):
     north = hartford_center_lat + lat_offset
     
     # Use population density to influence tract placement
-    population_weights = hartford_data['population'] / hartford_data['population'].max()
+    population_weights = (hartford_data['population'] / hartford_data['population'].max()).to_numpy()
     
     # Generate points with realistic clustering
-    random.seed(42)
-    np.random.seed(42)
-    
-    points = []
-    geometries = []
-    
-    for i, (_, row) in enumerate(hartford_data.iterrows()):
-        # Create clusters around Hartford center and some suburban areas
-        cluster_centers = [
-            (hartford_center_lat, hartford_center_lon),  # Downtown
-            (hartford_center_lat + 0.02, hartford_center_lon - 0.02),  # West End
-            (hartford_center_lat - 0.02, hartford_center_lon + 0.02),  # East Hartford area
-            (hartford_center_lat + 0.03, hartford_center_lon),  # North Hartford
-            (hartford_center_lat - 0.03, hartford_center_lon),  # South Hartford
-        ]
-        
-        # Choose cluster based on population (higher pop = more likely downtown)
-        pop_weight = population_weights.iloc[i]
-        if pop_weight > 0.8:
-            center_idx = 0  # Downtown
-        elif pop_weight > 0.6:
-            center_idx = random.choice([0, 1, 2])
-        else:
-            center_idx = random.choice(range(len(cluster_centers)))
-        
-        center_lat, center_lon = cluster_centers[center_idx]
-        
-        # Add random offset around cluster center
-        lat_spread = 0.008 * (1 + pop_weight)  # Higher density = tighter clustering
-        lon_spread = 0.008 * (1 + pop_weight)
-        
-        lat = center_lat + random.gauss(0, lat_spread)
-        lon = center_lon + random.gauss(0, lon_spread)
-        
-        # Keep within bounds
-        lat = max(south, min(north, lat))
-        lon = max(west, min(east, lon))
-        
-        points.append((lon, lat))
-        
-        # Create tract polygon around point
-        size_factor = 0.003 + (pop_weight * 0.002)  # Larger tracts for higher population
-        n_vertices = random.randint(6, 9)
-        
-        vertices = []
-        for j in range(n_vertices):
-            angle = (2 * math.pi * j) / n_vertices + random.uniform(-0.3, 0.3)
-            radius = size_factor * random.uniform(0.8, 1.2)
-            
-            vertex_lon = lon + radius * math.cos(angle)
-            vertex_lat = lat + radius * math.sin(angle)
-            
-            vertices.append((vertex_lon, vertex_lat))
-        
-        # Close polygon
-        vertices.append(vertices[0])
-        
-        try:
-            polygon = Polygon(vertices)
-            if polygon.is_valid and polygon.area > 0:
-                geometries.append(polygon)
-            else:
-                # Fallback to simple polygon
-                geometries.append(Polygon([
-                    (lon - size_factor, lat - size_factor),
-                    (lon + size_factor, lat - size_factor),
-                    (lon + size_factor, lat + size_factor),
-                    (lon - size_factor, lat + size_factor),
-                    (lon - size_factor, lat - size_factor)
-                ]))
-        except:
-            geometries.append(Polygon([
-                (lon - size_factor, lat - size_factor),
-                (lon + size_factor, lat - size_factor),
-                (lon + size_factor, lat + size_factor),
-                (lon - size_factor, lat + size_factor),
-                (lon - size_factor, lat - size_factor)
-            ]))
+    rng = np.random.default_rng(42)
+    
+    # Create clusters around Hartford center and some suburban areas
+    cluster_centers = np.array([
+        (hartford_center_lat, hartford_center_lon),  # Downtown
+        (hartford_center_lat + 0.02, hartford_center_lon - 0.02),  # West End
+        (hartford_center_lat - 0.02, hartford_center_lon + 0.02),  # East Hartford area
+        (hartford_center_lat + 0.03, hartford_center_lon),  # North Hartford
+        (hartford_center_lat - 0.03, hartford_center_lon),  # South Hartford
+    ])
+    
+    # Choose cluster based on population (higher pop = more likely downtown):
+    # downtown only, the first 3, or any cluster
+    n_choices = np.select(
+        [population_weights > 0.8, population_weights > 0.6],
+        [1, 3],
+        len(cluster_centers)
+    )
+    center_lat, center_lon = cluster_centers[rng.integers(0, n_choices)].T
+    
+    # Add random offset around cluster center
+    spread = 0.008 * (1 + population_weights)  # Higher density = tighter clustering
+    lats = center_lat + rng.normal(size=len(spread)) * spread
+    lons = center_lon + rng.normal(size=len(spread)) * spread
+    
+    # Keep within bounds
+    lats = np.clip(lats, south, north)
+    lons = np.clip(lons, west, east)
+    
+    # Polar offsets of every tract vertex, drawn in bulk, with the vertex count of each ring
+    size_factors = 0.003 + (population_weights * 0.002)  # Larger tracts for higher population
+    ring_sizes = rng.integers(6, 10, size=len(size_factors))
+    owner = np.repeat(np.arange(len(ring_sizes)), ring_sizes)
+    
+    # Position of each vertex within its own ring
+    vertex_number = np.arange(len(owner)) - np.repeat(np.cumsum(ring_sizes) - ring_sizes, ring_sizes)
+    vertex_angles = 2 * np.pi * vertex_number / ring_sizes[owner] + rng.uniform(-0.3, 0.3, size=len(owner))
+    vertex_radii = size_factors[owner] * rng.uniform(0.8, 1.2, size=len(owner))
+    
+    # Place every vertex around its tract center with one cos and one sin call
+    ring_coords = np.column_stack([
+        lons[owner] + vertex_radii * np.cos(vertex_angles),
+        lats[owner] + vertex_radii * np.sin(vertex_angles)
+    ])
+    
+    # Build every tract polygon in one call; linearrings closes each ring
+    geometries = shapely.polygons(shapely.linearrings(ring_coords, indices=owner))
+    
+    # Fallback to simple square for the rare self-intersecting or degenerate ring
+    fallback = ~shapely.is_valid(geometries) | (shapely.area(geometries) <= 0)
+    geometries[fallback] = shapely.box(
+        lons[fallback] - size_factors[fallback], lats[fallback] - size_factors[fallback],
+        lons[fallback] + size_factors[fallback], lats[fallback] + size_factors[fallback]
+    )
     
     # Create GeoDataFrame
     hartford_gdf = gpd.GeoDataFrame(hartford_data, geometry=geometries, crs='EPSG:4326')
@@ -144,6 +116,52 @@ def create_realistic_hartford_tracts(hartford_data):
     print(f"✓ Created {len(hartford_gdf)} realistic tract boundaries")
     return hartford_gdf
 
+# Popup HTML with the indentation between tags stripped once, so it is not repeated per tract
+_POPUP_TEMPLATE = re.sub(r'>\s+<', '><', """
+        <div style="width: 300px;">
+            <h4 style="margin-bottom: 10px; color: #333;">Census Tract {tract}</h4>
+            <hr style="margin: 5px 0;">
+            <table style="width: 100%; font-size: 12px;">
+                <tr><td><b>Vulnerability Level:</b></td><td style="color: {color}; font-weight: bold;">Level {level}</td></tr>
+                <tr><td><b>Population:</b></td><td>{population:,}</td></tr>
+                <tr><td><b>Median Income:</b></td><td>${median_income:,}</td></tr>
+                <tr><td><b>Temperature:</b></td><td>{mean_temp:.1f}°C</td></tr>
+                <tr><td><b>AC Access:</b></td><td>{ac_probability:.1%}</td></tr>
+                <tr><td><b>Green Space:</b></td><td>{green_space_pct:.1%}</td></tr>
+                <tr><td><b>Vulnerability Score:</b></td><td>{vulnerability_score:.3f}</td></tr>
+            </table>
+        </div>
+        """).strip()
+
+def _tract_style(feature):
+    """Style a tract from the fill color and opacity carried in its properties"""
+    return {
+        'fillColor': feature['properties']['fillColor'],
+        'color': 'white',
+        'weight': 1,
+        'fillOpacity': feature['properties']['fillOpacity'],
+        'opacity': 0.8
+    }
+
+def _compute_stats(hartford_gdf):
+    """Compute the summary statistics shown in both stats boxes from one groupby pass"""
+    by_level = hartford_gdf.groupby('vulnerability_index').agg(
+        population=('population', 'sum'),
+        income_sum=('median_income', 'sum'),
+        income_count=('median_income', 'count')
+    )
+    total_pop = int(by_level['population'].sum())
+    
+    # Levels 4-5 are high risk; the income average stays a plain per-tract mean
+    high = by_level[by_level.index.isin([4, 5])]
+    high_vuln_pop = int(high['population'].sum())
+    return {
+        'total_pop': total_pop,
+        'high_vuln_pop': high_vuln_pop,
+        'high_vuln_pct': (high_vuln_pop / total_pop) * 100,
+        'avg_income_high': high['income_sum'].sum() / high['income_count'].sum()
+    }
+
 def create_interactive_vulnerability_map(hartford_gdf):
     """Create the interactive vulnerability map using Folium"""
     
@@ -199,40 +217,46 @@ def create_interactive_vulnerability_map(hartford_gdf):
         return 0.5 + (vulnerability_level * 0.1)
     
     # Add vulnerability data to map
-    for idx, row in hartford_gdf.iterrows():
-        # Create popup content
-        popup_content = f"""
-        <div style="width: 300px;">
-            <h4 style="margin-bottom: 10px; color: #333;">Census Tract {row['tract']}</h4>
-            <hr style="margin: 5px 0;">
-            <table style="width: 100%; font-size: 12px;">
-                <tr><td><b>Vulnerability Level:</b></td><td style="color: {get_color(row['vulnerability_index'])}; font-weight: bold;">Level {row['vulnerability_index']}</td></tr>
-                <tr><td><b>Population:</b></td><td>{row['population']:,}</td></tr>
-                <tr><td><b>Median Income:</b></td><td>${row['median_income']:,}</td></tr>
-                <tr><td><b>Temperature:</b></td><td>{row['mean_temp']:.1f}°C</td></tr>
-                <tr><td><b>AC Access:</b></td><td>{row['ac_probability']:.1%}</td></tr>
-                <tr><td><b>Green Space:</b></td><td>{row['green_space_pct']:.1%}</td></tr>
-                <tr><td><b>Vulnerability Score:</b></td><td>{row['vulnerability_score']:.3f}</td></tr>
-            </table>
-        </div>
-        """
-        
-        # Create tooltip
-        tooltip_content = f"Tract {row['tract']}: Level {row['vulnerability_index']} Risk"
-        
-        # Add tract to map
+    levels = hartford_gdf['vulnerability_index']
+    fill_colors = levels.map(get_color)
+    
+    # Create popup content from the shared minified template
+    popup_fields = hartford_gdf[[
+        'tract', 'population', 'median_income', 'mean_temp',
+        'ac_probability', 'green_space_pct', 'vulnerability_score'
+    ]].assign(color=fill_colors, level=levels)
+    popups = [_POPUP_TEMPLATE.format_map(fields) for fields in popup_fields.to_dict('records')]
+    
+    # Style, popup and the raw tooltip fields travel with each tract as feature properties;
+    # the browser lays out the tooltip from the fields
+    properties = pd.DataFrame({
+        'tract': hartford_gdf['tract'],
+        'vulnerability_index': levels,
+        'fillColor': fill_colors,
+        'fillOpacity': levels.map(get_opacity),
+        'popup': popups
+    }).to_dict('records')
+    
+    # Serialize every tract geometry to GeoJSON in one call instead of walking each in Python;
+    # coordinates are rounded to ~1 m so the embedded GeoJSON carries no float noise
+    tract_geometries = shapely.set_precision(hartford_gdf.geometry.to_numpy(), 1e-5, mode='pointwise')
+    features = [
+        {'type': 'Feature', 'geometry': json.loads(geometry), 'properties': tract_properties}
+        for geometry, tract_properties in zip(shapely.to_geojson(tract_geometries), properties)
+    ]
+    
+    # Add one layer per vulnerability level
+    for level, positions in sorted(levels.groupby(levels).indices.items()):
         folium.GeoJson(
-            row.geometry.__geo_interface__,
-            style_function=lambda x, color=get_color(row['vulnerability_index']), 
-                          opacity=get_opacity(row['vulnerability_index']): {
-                'fillColor': color,
-                'color': 'white',
-                'weight': 1,
-                'fillOpacity': opacity,
-                'opacity': 0.8
-            },
-            popup=folium.Popup(popup_content, max_width=400),
-            tooltip=tooltip_content
+            {'type': 'FeatureCollection', 'features': [features[i] for i in positions]},
+            name=f'Level {level}',
+            style_function=_tract_style,
+            popup=folium.GeoJsonPopup(fields=['popup'], labels=False, localize=False, max_width=400),
+            tooltip=folium.GeoJsonTooltip(
+                fields=['tract', 'vulnerability_index'],
+                aliases=['Census Tract', 'Vulnerability Level'],
+                localize=False
+            )
         ).add_to(m)
     
     # Add title
@@ -268,10 +292,11 @@ def create_interactive_vulnerability_map(hartford_gdf):
     m.get_root().html.add_child(folium.Element(legend_html))
     
     # Add statistics box
-    total_pop = hartford_gdf['population'].sum()
-    high_vuln_pop = hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])]['population'].sum()
-    high_vuln_pct = (high_vuln_pop / total_pop) * 100
-    avg_income_high = hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])]['median_income'].mean()
+    stats = _compute_stats(hartford_gdf)
+    total_pop = stats['total_pop']
+    high_vuln_pop = stats['high_vuln_pop']
+    high_vuln_pct = stats['high_vuln_pct']
+    avg_income_high = stats['avg_income_high']
     
     stats_html = f'''
     <div style="position: fixed; 
@@ -386,9 +411,10 @@ def create_static_professional_map(hartford_gdf):
                 fontsize=16, fontweight='bold', ha='center')
     
     # Add statistics box
-    total_pop = hartford_gdf['population'].sum()
-    high_vuln_pop = hartford_gdf[hartford_gdf['vulnerability_index'].isin([4, 5])]['population'].sum()
-    high_vuln_pct = (high_vuln_pop / total_pop) * 100
+    stats = _compute_stats(hartford_gdf)
+    total_pop = stats['total_pop']
+    high_vuln_pop = stats['high_vuln_pop']
+    high_vuln_pct = stats['high_vuln_pct']
     
     stats_text = f"Key Statistics:\n" \
                 f"• Total Population: {total_pop:,}\n" \
@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Shared pipeline for the Hartford Heat Vulnerability Index static maps
+Used by create_accurate_hartford_map.py (Voronoi tracts) and
+create_correct_hartford_map.py (grid tracts)
+"""
+
+import os
+import importlib.util
+import pandas as pd
+import geopandas as gpd
+import sys
+import matplotlib
+# Render headless unless a window was requested with --show or HVI_SHOW
+SHOW_PLOT = '--show' in sys.argv or bool(os.environ.get('HVI_SHOW'))
+if not SHOW_PLOT:
+    matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+from shapely.prepared import prep
+import shapely.vectorized
+import matplotlib.patches as mpatches
+from matplotlib.colors import ListedColormap
+from scipy.spatial import Voronoi
+from functools import lru_cache
+from itertools import chain
+import warnings
+warnings.filterwarnings('ignore')
+
+try:
+    # Compiled extension, built with `python setup.py build_ext --inplace`
+    from _pip import contains_ring_vec as _contains_ring_vec_cython
+    HAS_CYTHON_PIP = True
+except ImportError:
+    HAS_CYTHON_PIP = False
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Multithreaded CSV reader and Parquet cache, used when pyarrow is installed;
+# pandas imports it itself, so only check that it is available
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+# Vulnerability level colors
+_HARTFORD_PALETTE = {
+    1: '#2E8B57',  # Dark green (lowest risk)
+    2: '#90EE90',  # Light green (low risk)
+    3: '#FFFF00',  # Yellow (moderate risk)
+    4: '#FFA500',  # Orange (high risk)
+    5: '#FF4500'   # Red-orange (highest risk)
+}
+# Same colors indexed by level - 1 for a single gather per render
+_PALETTE_ARR = np.array([_HARTFORD_PALETTE[level] for level in [1, 2, 3, 4, 5]])
+
+# Only the columns used for mapping, with compact dtypes
+_VULNERABILITY_DTYPES = {
+    'population': 'int32',
+    'median_income': 'float32',
+    'vulnerability_index': 'int8',
+    'mean_temp': 'float32'
+}
+
+if HAS_NUMBA and not HAS_CYTHON_PIP:
+    @njit(cache=True)
+    def contains_ring(bx, by, x, y):
+        """Ray-casting point-in-polygon test against a single ring"""
+        inside = False
+        n = bx.size
+        j = n - 1
+        for i in range(n):
+            if (by[i] > y) != (by[j] > y) and x < (bx[j] - bx[i]) * (y - by[i]) / (by[j] - by[i]) + bx[i]:
+                inside = not inside
+            j = i
+        return inside
+    
+    @njit(cache=True)
+    def _contains_ring_vec_numba(bx, by, xs, ys, out):
+        """Batched ray-casting test, writing 1/0 per candidate into out"""
+        for k in range(xs.size):
+            out[k] = contains_ring(bx, by, xs[k], ys[k])
+
+# Batched point-in-ring kernel: the compiled extension, else the Numba one
+if HAS_CYTHON_PIP:
+    contains_ring_vec = _contains_ring_vec_cython
+elif HAS_NUMBA:
+    contains_ring_vec = _contains_ring_vec_numba
+else:
+    contains_ring_vec = None
+
+def points_in_boundary(prep_boundary, ring_x, ring_y, lons, lats):
+    """Test candidate points against the city boundary in one call"""
+    if HAS_CYTHON_PIP or HAS_NUMBA:
+        inside = np.empty(lons.size, dtype=np.uint8)
+        contains_ring_vec(ring_x, ring_y, lons, lats, inside)
+        return inside.view(np.bool_)
+    return shapely.vectorized.contains(prep_boundary, lons, lats)
+
+@lru_cache(maxsize=None)
+def load_vulnerability_data(data_path):
+    """Load the vulnerability CSV once per process, through a Parquet copy when pyarrow is installed"""
+    columns = list(_VULNERABILITY_DTYPES)
+    if HAS_PYARROW:
+        parquet_path = os.path.splitext(data_path)[0] + '.parquet'
+        try:
+            # Rebuild the Parquet copy when it is missing or older than the CSV
+            if os.path.exists(data_path) and (
+                    not os.path.exists(parquet_path)
+                    or os.path.getmtime(parquet_path) < os.path.getmtime(data_path)):
+                pd.read_csv(data_path, dtype=_VULNERABILITY_DTYPES, engine='pyarrow').to_parquet(
+                    parquet_path, engine='pyarrow', index=False)
+            
+            # Only the mapped columns are read back
+            return pd.read_parquet(parquet_path, engine='pyarrow', columns=columns)
+        except OSError:
+            # Unwritable output directory or unreadable copy - parse the CSV instead
+            pass
+    return pd.read_csv(data_path, usecols=columns, dtype=_VULNERABILITY_DTYPES, engine='c')
+
+@lru_cache(maxsize=None)
+def hartford_boundary(boundary_coords):
+    """Build the city boundary polygon once per coordinate tuple"""
+    return Polygon(boundary_coords)
+
+def largest_parts(tracts):
+    """Replace each multi-part tract with its largest part, in array form"""
+    tracts = tracts.copy()
+    # Multi-part and collection type ids are 4 and above
+    multi = np.flatnonzero(shapely.get_type_id(tracts) >= 4)
+    if multi.size:
+        parts, owner = shapely.get_parts(tracts[multi], return_index=True)
+        # Sort parts by owning tract, then by descending area
+        order = np.lexsort((-shapely.area(parts), owner))
+        owner_sorted = owner[order]
+        first = np.unique(owner_sorted, return_index=True)[1]
+        tracts[multi[owner_sorted[first]]] = parts[order[first]]
+    return tracts
+
+def build_hartford_map(data_path, boundary_coords, tract_strategy, out_prefix, map_style):
+    """Load data, build tracts with the given strategy and render the map"""
+    
+    # Load the vulnerability data
+    try:
+        hartford_data = load_vulnerability_data(data_path)
+        print(f"✓ Loaded vulnerability data: {len(hartford_data)} tracts")
+    except FileNotFoundError:
+        print("✗ Vulnerability data not found. Run hartford_hvi_implementation.py first.")
+        return
+    
+    # Create Hartford city boundary and census tracts
+    hartford_gdf = create_hartford_tracts(hartford_data, boundary_coords, tract_strategy)
+    
+    # Create the final map
+    create_hartford_vulnerability_map(hartford_gdf, boundary_coords, out_prefix, map_style)
+    return hartford_gdf
+
+def create_hartford_tracts(hartford_data, boundary_coords, tract_strategy):
+    """Create census tracts inside the city boundary using 'voronoi' or 'grid'"""
+    
+    print(f"Creating Hartford city boundary with {tract_strategy} census tracts...")
+    
+    city_boundary = hartford_boundary(boundary_coords)
+    
+    if tract_strategy == 'voronoi':
+        # Prepare the boundary once for all containment tests
+        prep_boundary = prep(city_boundary)
+        ring = np.asarray(boundary_coords, dtype=np.float64)
+        ring_x = np.ascontiguousarray(ring[:, 0])
+        ring_y = np.ascontiguousarray(ring[:, 1])
+        
+        # Create census tract centers using population-based clustering
+        tract_centers = generate_realistic_tract_centers(hartford_data, prep_boundary, ring_x, ring_y)
+        
+        # Create Voronoi diagram for non-overlapping tracts
+        tract_polygons = create_voronoi_tracts(tract_centers, city_boundary)
+    elif tract_strategy == 'grid':
+        tract_polygons = create_non_overlapping_tracts(hartford_data, city_boundary)
+    else:
+        raise ValueError(f"Unknown tract strategy: {tract_strategy!r}")
+    
+    # Create GeoDataFrame, attaching a geometry array that already carries its CRS
+    geometry = gpd.GeoSeries(tract_polygons, crs='EPSG:4326').values
+    hartford_gdf = gpd.GeoDataFrame(
+        hartford_data.iloc[:len(tract_polygons)],
+        geometry=geometry
+    )
+    
+    print(f"✓ Created {len(hartford_gdf)} non-overlapping census tracts within Hartford boundary")
+    return hartford_gdf
+
+def generate_realistic_tract_centers(hartford_data, prep_boundary, ring_x, ring_y):
+    """Generate realistic tract center points based on Hartford's actual geography"""
+    
+    # Hartford's real neighborhoods and their approximate centers
+    # Based on actual Hartford neighborhoods
+    neighborhoods = [
+        {"name": "Downtown", "center": (-72.6851, 41.7584), "weight": 4.0},  # Central business district
+        {"name": "Asylum Hill", "center": (-72.6950, 41.7620), "weight": 3.0},  # Historic neighborhood
+        {"name": "North End", "center": (-72.6900, 41.7750), "weight": 2.8},  # North of downtown
+        {"name": "South End", "center": (-72.6800, 41.7450), "weight": 2.5},  # South of downtown
+        {"name": "West End", "center": (-72.7000, 41.7550), "weight": 2.2},  # West side
+        {"name": "Frog Hollow", "center": (-72.6980, 41.7580), "weight": 2.0},  # Southwest area
+        {"name": "Behind the Rocks", "center": (-72.6750, 41.7520), "weight": 1.8},  # Southeast
+        {"name": "Clay Arsenal", "center": (-72.6700, 41.7650), "weight": 1.6},  # Northeast
+        {"name": "Barry Square", "center": (-72.6900, 41.7500), "weight": 1.8},  # South-central
+        {"name": "Parkville", "center": (-72.7100, 41.7480), "weight": 1.5},  # Southwest
+        {"name": "Upper Albany", "center": (-72.6850, 41.7700), "weight": 1.4},  # North-central
+        {"name": "Sheldon Charter Oak", "center": (-72.6650, 41.7600), "weight": 1.3},  # East side
+    ]
+    
+    tract_centers = []
+    rng = np.random.default_rng(42)  # For reproducible results
+    
+    # Column maxima are computed once rather than per tract
+    pop_max = float(hartford_data['population'].max())
+    inc_max = float(hartford_data['median_income'].max())
+    
+    # Sort tracts by population for better placement
+    sorted_data = hartford_data.sort_values('population', ascending=False)
+    population_weights = sorted_data['population'].to_numpy(dtype=float) / pop_max
+    income_weights = sorted_data['median_income'].to_numpy(dtype=float) / inc_max
+    
+    # Choose neighborhood based on population and income (more realistic distribution)
+    combined_weights = (population_weights + income_weights) / 2
+    
+    # Bucket every tract up front: 3 = >0.8, 2 = >0.6, 1 = >0.4, 0 = lower
+    buckets = np.digitize(combined_weights, [0.4, 0.6, 0.8], right=True)
+    
+    # Neighborhood candidates (first k neighborhoods) and probabilities per bucket
+    bucket_choices = [
+        (len(neighborhoods), None),  # Lower - any neighborhood
+        (8, None),  # Medium - various neighborhoods
+        (4, [0.4, 0.3, 0.2, 0.1]),  # Medium-high - downtown area neighborhoods
+        (2, [0.7, 0.3]),  # High population/income - downtown or asylum hill
+    ]
+    
+    # Draw every tract's neighborhood index with one call per bucket
+    neighborhood_idx = np.empty(len(buckets), dtype=np.intp)
+    for bucket, (k, probs) in enumerate(bucket_choices):
+        in_bucket = buckets == bucket
+        neighborhood_idx[in_bucket] = rng.choice(k, size=int(in_bucket.sum()), p=probs)
+    
+    neighborhood_centers = np.array([n["center"] for n in neighborhoods])
+    neighborhood_weights = np.array([n["weight"] for n in neighborhoods])
+    
+    # Spread based on neighborhood weight and population, for every tract
+    spreads = 0.006 / neighborhood_weights[neighborhood_idx] * (0.5 + population_weights)
+    
+    # One standard-normal buffer holds every tract's (lon, lat) candidate offsets
+    noise = rng.standard_normal((len(neighborhood_idx), 2, 64))
+    
+    for i, idx in enumerate(neighborhood_idx):
+        # Add some randomness around neighborhood center
+        center_lon, center_lat = neighborhood_centers[idx]
+        
+        # Scale this tract's slice of the buffer and test all candidates in one call
+        lons = center_lon + noise[i, 0] * spreads[i]
+        lats = center_lat + noise[i, 1] * spreads[i]
+        inside = points_in_boundary(prep_boundary, ring_x, ring_y, lons, lats)
+        
+        if inside.any():
+            first = np.argmax(inside)
+            tract_centers.append((lons[first], lats[first]))
+        else:
+            # Fallback if we can't find a good point
+            tract_centers.append((center_lon, center_lat))
+    
+    print(f"✓ Generated {len(tract_centers)} realistic tract centers")
+    return tract_centers
+
+def create_voronoi_tracts(tract_centers, city_boundary):
+    """Create non-overlapping census tracts using Voronoi tessellation"""
+    
+    print("Creating Voronoi tessellation for census tracts...")
+    
+    # Convert to numpy array for Voronoi
+    points = np.array(tract_centers)
+    
+    # Create Voronoi diagram
+    vor = Voronoi(points)
+    
+    # Pad the ragged region lists into one index array (-2 marks padding)
+    region_lens = np.fromiter((len(region) for region in vor.regions), dtype=np.intp,
+                              count=len(vor.regions))
+    max_len = max(int(region_lens.max()), 1)
+    region_arr = np.full((len(vor.regions), max_len), -2, dtype=np.intp)
+    region_arr[np.arange(max_len) < region_lens[:, None]] = np.fromiter(
+        chain.from_iterable(vor.regions), dtype=np.intp, count=int(region_lens.sum()))
+    
+    # Unbounded (-1 vertex) or empty cells need a fallback polygon
+    point_region = np.asarray(vor.point_region)
+    unbounded = (region_arr == -1).any(axis=1) | (region_lens == 0)
+    bad_mask = unbounded[point_region]
+    
+    raw_polygons = [None] * len(points)
+    
+    # Handle edge cases - create a small polygon around each point
+    buffer_size = 0.002
+    bad_idx = np.flatnonzero(bad_mask)
+    # quad_segs=16 matches the segment count of Point.buffer
+    bad_buffers = shapely.buffer(shapely.points(points[bad_idx]), buffer_size, quad_segs=16)
+    for i, tract_polygon in zip(bad_idx, bad_buffers):
+        raw_polygons[i] = tract_polygon
+    
+    # Create polygons from Voronoi vertices for every bounded cell in one call
+    good_idx = np.flatnonzero(~bad_mask)
+    good_regions = point_region[good_idx]
+    good_lens = region_lens[good_regions]
+    vertex_index = region_arr[good_regions][np.arange(max_len) < good_lens[:, None]]
+    cell_polygons = shapely.polygons(shapely.linearrings(
+        vor.vertices[vertex_index], indices=np.repeat(np.arange(len(good_idx)), good_lens)))
+    
+    # Repair degenerate rings in one call, keeping the largest piece
+    invalid = ~shapely.is_valid(cell_polygons)
+    cell_polygons[invalid] = largest_parts(shapely.make_valid(cell_polygons[invalid]))
+    
+    for i, tract_polygon in zip(good_idx, cell_polygons):
+        raw_polygons[i] = tract_polygon
+    
+    # Clip all cells to the city boundary in a single vectorized call
+    clipped = gpd.GeoSeries(raw_polygons, crs='EPSG:4326').intersection(city_boundary)
+    
+    # Ensure we have valid polygons - re-clip a smaller buffer only where needed
+    bad = np.flatnonzero((clipped.is_empty | ~clipped.is_valid).to_numpy())
+    if bad.size:
+        buffer_size = 0.0015
+        clipped.iloc[bad] = shapely.intersection(
+            shapely.buffer(shapely.points(points[bad]), buffer_size, quad_segs=16), city_boundary)
+    
+    # Handle MultiPolygon case - keep the largest part of each tract
+    tract_polygons = list(largest_parts(clipped.to_numpy()))
+    
+    print(f"✓ Created {len(tract_polygons)} non-overlapping tract polygons")
+    return tract_polygons
+
+def create_non_overlapping_tracts(hartford_data, city_boundary):
+    """Create non-overlapping census tracts within Hartford"""
+    
+    print("Creating non-overlapping census tracts...")
+    
+    bounds = city_boundary.bounds
+    west, south, east, north = bounds
+    
+    n_tracts = min(len(hartford_data), 50)  # Limit for performance
+    
+    # Create a reasonable grid
+    cols = int(np.ceil(np.sqrt(n_tracts * 1.2)))  # Slightly rectangular
+    rows = int(np.ceil(n_tracts / cols))
+    
+    cell_width = (east - west) / cols
+    cell_height = (north - south) / rows
+    
+    # Calculate cell boundaries for every row and column at once
+    left = west + np.arange(cols) * cell_width
+    right = left + cell_width
+    bottom = south + np.arange(rows) * cell_height
+    top = bottom + cell_height
+    
+    # Closed ring coordinates for all cells, shape (rows * cols, 5, 2)
+    ring_x = np.stack([left, right, right, left, left], axis=-1)
+    ring_y = np.stack([bottom, bottom, top, top, bottom], axis=-1)
+    coords = np.stack(
+        np.broadcast_arrays(ring_x[None, :, :], ring_y[:, None, :]), axis=-1
+    ).reshape(rows * cols, 5, 2)
+    
+    # Create cell polygons and intersect with city boundary in single calls
+    cells = shapely.polygons(coords)
+    tracts = shapely.intersection(cells, city_boundary)
+    
+    # Keep if valid and reasonable size
+    keep = (shapely.area(tracts) > 0.0001) & shapely.is_valid(tracts)
+    
+    # Handle MultiPolygon case - keep the largest part of each tract
+    tract_polygons = list(largest_parts(tracts[keep][:n_tracts]))
+    
+    print(f"✓ Created {len(tract_polygons)} non-overlapping tract polygons")
+    return tract_polygons
+
+def _plot_levels(ax, hartford_gdf, linewidth):
+    """Plot all vulnerability levels in one pass, lowest level drawn first"""
+    cmap = ListedColormap([_HARTFORD_PALETTE[level] for level in [1, 2, 3, 4, 5]])
+    hartford_gdf.sort_values('vulnerability_index').plot(
+        ax=ax,
+        column='vulnerability_index',
+        cmap=cmap,
+        vmin=1,
+        vmax=5,
+        edgecolor='white',
+        linewidth=linewidth,
+        alpha=0.85,
+        legend=False
+    )
+
+def _compute_stats(hartford_gdf):
+    """Compute the summary statistics shown in the stats box and console"""
+    population = hartford_gdf['population'].to_numpy()
+    total_pop = int(population.sum())
+    n_tracts = len(hartford_gdf)
+    
+    # Levels 4-5 are high risk; build the mask once for both counts
+    high_mask = hartford_gdf['vulnerability_index'].to_numpy() >= 4
+    high_vuln_tracts = int(high_mask.sum())
+    high_vuln_pop = int(population[high_mask].sum())
+    return {
+        'total_pop': total_pop,
+        'n_tracts': n_tracts,
+        'high_vuln_tracts': high_vuln_tracts,
+        'high_vuln_tract_pct': high_vuln_tracts / n_tracts * 100 if n_tracts > 0 else 0,
+        'high_vuln_pop': high_vuln_pop,
+        'high_vuln_pct': (high_vuln_pop / total_pop) * 100 if total_pop > 0 else 0,
+        'avg_temp': hartford_gdf['mean_temp'].mean()
+    }
+
+def _draw_north_arrow(ax):
+    """Add a north arrow near the top-right corner of the axes"""
+    bounds = ax.get_xlim() + ax.get_ylim()
+    x_pos = bounds[1] - (bounds[1] - bounds[0]) * 0.08
+    y_pos = bounds[3] - (bounds[3] - bounds[2]) * 0.12
+    ax.annotate('N', xy=(x_pos, y_pos), xytext=(x_pos, y_pos - (bounds[3] - bounds[2]) * 0.04),
+                arrowprops=dict(arrowstyle='->', lw=3, color='black'),
+                fontsize=16, fontweight='bold', ha='center')
+
+def create_hartford_vulnerability_map(hartford_gdf, boundary_coords, out_prefix, map_style):
+    """Create the final Hartford vulnerability map using the script's map_style"""
+    
+    print("Creating Hartford Heat Vulnerability Index map...")
+    
+    # Create figure
+    fig, ax = plt.subplots(1, 1, figsize=map_style['figsize'])
+    
+    # Plot each vulnerability level
+    _plot_levels(ax, hartford_gdf, map_style['tract_linewidth'])
+    
+    # Add Hartford city boundary outline
+    city_boundary = hartford_boundary(boundary_coords)
+    city_gdf = gpd.GeoDataFrame([1], geometry=[city_boundary], crs='EPSG:4326')
+    city_gdf.boundary.plot(ax=ax, color='black', linewidth=map_style['boundary_linewidth'], alpha=0.9)
+    
+    # Create legend for vulnerability levels
+    legend_elements = [
+        mpatches.Patch(color=_HARTFORD_PALETTE[1], label='Level 1 - Lowest Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[2], label='Level 2 - Low Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[3], label='Level 3 - Moderate Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[4], label='Level 4 - High Risk'),
+        mpatches.Patch(color=_HARTFORD_PALETTE[5], label='Level 5 - Highest Risk')
+    ]
+    
+    # Add Connecticut River indication (eastern boundary)
+    river_coords = map_style.get('river_coords')
+    if river_coords:
+        river_x = [coord[0] for coord in river_coords]
+        river_y = [coord[1] for coord in river_coords]
+        ax.plot(river_x, river_y, color='blue', linewidth=4, alpha=0.7, label='Connecticut River')
+        legend_elements.append(mpatches.Patch(color='blue', label='Connecticut River'))
+    
+    # Customize the map
+    ax.set_title(map_style['title'], fontsize=map_style['title_fontsize'], fontweight='bold', pad=20)
+    
+    # Remove axis ticks and labels for cleaner look
+    ax.set_xticks([])
+    ax.set_yticks([])
+    ax.set_xlabel('')
+    ax.set_ylabel('')
+    
+    # Set background color
+    ax.set_facecolor(map_style['facecolor'])
+    
+    legend = ax.legend(
+        handles=legend_elements,
+        loc='upper left',
+        fontsize=11,
+        title='Heat Vulnerability Level',
+        title_fontsize=12,
+        frameon=True,
+        fancybox=True,
+        shadow=True,
+        bbox_to_anchor=map_style.get('legend_anchor')
+    )
+    legend.get_title().set_fontweight('bold')
+    
+    # Add north arrow
+    _draw_north_arrow(ax)
+    
+    # Add key statistics box
+    stats = _compute_stats(hartford_gdf)
+    
+    stats_lines = [
+        "Total Population: {total_pop:,}",
+        "Census Tracts: {n_tracts}",
+        "High Risk Tracts: {high_vuln_tracts} ({high_vuln_tract_pct:.1f}%)",
+        "People at High Risk: {high_vuln_pop:,} ({high_vuln_pct:.1f}%)",
+    ] + map_style['stats_lines']
+    stats_text = f"{map_style['stats_title']}:\n" + "\n".join(
+        "• " + line.format(**stats) for line in stats_lines)
+    
+    ax.text(0.98, 0.98, stats_text,
+           transform=ax.transAxes,
+           fontsize=10,
+           verticalalignment='top',
+           horizontalalignment='right',
+           bbox=dict(boxstyle="round,pad=0.5", facecolor="white", alpha=0.9, edgecolor='gray'))
+    
+    # Add geographic context
+    ax.text(0.02, 0.02,
+           map_style['context_text'],
+           transform=ax.transAxes,
+           fontsize=8,
+           alpha=0.8,
+           bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.8))
+    
+    # Ensure equal aspect ratio and fixed margins (no layout solver pass)
+    ax.set_aspect('equal')
+    fig.subplots_adjust(left=0.02, right=0.98, top=0.92, bottom=0.02)
+    
+    # Save the map as vector PDF first (no rasterization needed)
+    pdf_path = f'{out_prefix}.pdf'
+    fig.savefig(pdf_path, bbox_inches='tight', facecolor='white')
+    print(f"✓ Saved PDF version to {pdf_path}")
+    
+    # Then rasterize once for the PNG at print-adequate resolution
+    output_path = f'{out_prefix}.png'
+    fig.savefig(output_path, dpi=200, bbox_inches='tight', facecolor='white')
+    print(f"✓ Saved {map_style['map_label']} to {output_path}")
+    
+    if SHOW_PLOT:
+        plt.show()
+    
+    # Release the figure now rather than at interpreter exit
+    plt.close(fig)
+    
+    # Print summary
+    print("\n📊 Hartford Heat Vulnerability Index Summary:")
+    for line in map_style['summary_lines']:
+        print(f"   • {line.format(**stats)}")
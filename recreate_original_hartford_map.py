@@ -5,6 +5,7 @@ Generates identical output to hvi_output/hartford_heat_vulnerability_interactive
 """
 
 import json
+import pandas as pd
 import folium
 from folium import plugins
 import warnings
@@ -139,27 +140,22 @@ def recreate_original_hartford_map():
     '''
     m.get_root().html.add_child(folium.Element(legend_html))
     
-    # Calculate statistics from extracted data
+    # Calculate statistics from extracted data, parsing each display column once
     all_tracts = data['census_tracts']
-    total_pop = 0
-    high_vuln_pop = 0
-    high_risk_incomes = []
+    popup_data = pd.DataFrame([tract['popup_data'] for tract in all_tracts])
+    population = popup_data['population'].str.replace(',', '', regex=False).astype(int)
+    total_pop = int(population.sum())
     
-    for tract in all_tracts:
-        popup_data = tract['popup_data']
-        pop_str = popup_data['population'].replace(',', '')
-        population = int(pop_str)
-        total_pop += population
-        
-        if tract['vulnerability_level'] in [4, 5]:
-            high_vuln_pop += population
-            # Parse income
-            income_str = popup_data['median_income'].replace('$', '').replace(',', '')
-            if income_str.isdigit():
-                high_risk_incomes.append(int(income_str))
+    # Levels 4-5 are high risk; build the mask once for population and income
+    high_mask = pd.Series([tract['vulnerability_level'] for tract in all_tracts]).isin([4, 5])
+    high_vuln_pop = int(population[high_mask].sum())
+    
+    # Parse income, keeping only values that are plain digits once '$' and ',' are gone
+    income = popup_data.loc[high_mask, 'median_income'].str.replace(r'[$,]', '', regex=True)
+    high_risk_incomes = income[income.str.isdigit()].astype(int)
     
     high_vuln_pct = (high_vuln_pop / total_pop) * 100
-    avg_income_high = sum(high_risk_incomes) / len(high_risk_incomes) if high_risk_incomes else 0
+    avg_income_high = high_risk_incomes.mean() if len(high_risk_incomes) else 0
     
     # Add exact same statistics box as original  
     stats_html = f'''
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Build the optional compiled point-in-polygon extension used by
+hartford_map_core.py (Voronoi tract strategy)
+
+Usage: python setup.py build_ext --inplace
+"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name='hartford-hvi-pip',
+    ext_modules=cythonize(['_pip.pyx'], language_level=3),
+)